@@ -0,0 +1,486 @@
+import argparse
+import io
+import os
+import tempfile
+import sys
+import random
+import socket
+import subprocess
+import time
+from array import array
+
+import psutil
+
+from main import (AdaptiveRefresh, Aggregator, AlertEngine, CpuSample, DeviceRates, GalaxyManager, History, NicRate, ProcEntry, ProcessTable, ProcInfo, ProcReader, Recorder, RecordingReader, Sampler,
+                  BUILTIN_PLUGINS, compute_layout, parse_endpoint, parse_rules, plugin_entry_points, snapshot_to_json, snapshot_to_prometheus)
+
+def measure(fn, rounds):
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+def synthetic_entry(pid, cpu, memory, threads, ppid=0, user='root', cgroup='/'):
+    return ProcEntry(None, pid, f"proc-{pid}", ppid, user, cgroup, cpu, memory, threads, 'sleeping')
+
+def synthetic_process_table(count):
+    table = ProcessTable()
+    rng = random.Random(42)
+    for pid in range(1, count + 1):
+        entry = table.entries[pid] = synthetic_entry(pid, rng.random() * 100, rng.random() * 5, rng.randint(1, 64))
+        entry.read_rate, entry.write_rate, entry.connections = rng.random() * 2**20, rng.random() * 2**20, rng.randint(0, 50)
+    return table
+
+def bench_process_top(count=50000, rounds=20):
+    table = synthetic_process_table(count)
+    rng = random.Random(7)
+    entries = list(table.entries.values())
+
+    def churn():
+        for entry in rng.sample(entries, count // 20):
+            entry.cpu = rng.random() * 100
+
+    def full_sort():
+        rows = [{'pid': e.pid, 'name': e.name, 'cpu_percent': e.cpu, 'memory_percent': e.memory, 'num_threads': e.threads, 'status': e.status} for e in entries]
+        return sorted(rows, key=lambda x: x['cpu_percent'] or 0, reverse=True)[:5]
+    
+    results = {
+        'sorted() over dicts (ms)': measure(full_sort, rounds),
+        'in-place update, 5% churn (ms)': measure(churn, rounds),
+    }
+    for key in ProcessTable.SORT_KEYS:
+        results[f"nlargest top-5 by {key} (ms)"] = measure(lambda: table.top(5, key), rounds)
+    
+    # The real per-tick path on this host, against a plain psutil scan that keeps no state
+    fields = ['pid', 'name', 'cpu_percent', 'memory_percent', 'num_threads', 'status']
+    iterate = lambda: sorted(psutil.process_iter(fields), key=lambda p: p.info['cpu_percent'] or 0, reverse=True)[:5]
+    reader = ProcReader() if ProcReader.available() else None
+    try:
+        for backend, source in (('proc', reader), ('psutil', None)):
+            if backend == 'proc' and reader is None:
+                continue
+            live = ProcessTable(reader=source)
+            live.update()
+            results[f"update() + top-5, {backend}, {len(live.entries)} procs (ms)"] = measure(lambda: (live.update(), live.top(5)), rounds)
+    finally:
+        if reader:
+            reader.close()
+    results["process_iter() + sorted() (ms)"] = measure(iterate, rounds)
+    return results
+
+def bench_process_groups(count=20000, cgroups=300, rounds=20):
+    rng = random.Random(19)
+    table = ProcessTable()
+    for pid in range(1, count + 1):
+        ppid = rng.randint(1, pid - 1) if pid > 1 else 0
+        table.insert(synthetic_entry(pid, rng.random() * 10, rng.random(), rng.randint(1, 16), ppid, f"user{pid % 20}",
+                                     f"/kubepods/pod{pid % cgroups}/ctr"))
+    entries = list(table.entries.values())
+    
+    def churn():
+        for entry in rng.sample(entries, count // 20):
+            table.set_values(entry, rng.random() * 10, entry.memory, entry.threads)
+    
+    def rebuild():
+        rollups = {'user': {}, 'cgroup': {}, 'tree': {}}
+        for entry in entries:
+            keys = [('user', entry.user), ('cgroup', entry.cgroup)]
+            pid = entry.pid
+            while pid in table.entries:
+                keys.append(('tree', pid))
+                pid = table.entries[pid].ppid
+            for kind, key in keys:
+                rollup = rollups[kind].setdefault(key, [0.0, 0.0, 0, 0])
+                rollup[0] += entry.cpu
+                rollup[1] += entry.memory
+                rollup[2] += entry.threads
+                rollup[3] += 1
+        return rollups
+    
+    return {
+        f"full rollup rebuild, {count} procs (ms)": measure(rebuild, rounds),
+        "incremental update, 5% churn (ms)": measure(churn, rounds),
+        f"cgroup rows, {cgroups} cgroups (ms)": measure(lambda: table.group_rows('cgroup'), rounds),
+        "tree rows (ms)": measure(lambda: table.group_rows('tree'), rounds),
+    }
+
+def synthetic_snapshot(cores=16):
+    sampler = Sampler()
+    data = dict(sampler.collect_now())
+    sampler.stop()
+    rng = random.Random(3)
+    data['cpu'] = CpuSample(rng.random() * 100, tuple(rng.random() * 100 for _ in range(cores)))
+    return data
+
+def bench_snapshot_export(cores=16, rounds=2000):
+    snapshot = synthetic_snapshot(cores)
+    return {
+        f"JSON Lines snapshot, {cores} cores (ms)": measure(lambda: snapshot_to_json(snapshot), rounds),
+        f"Prometheus text, {cores} cores (ms)": measure(lambda: snapshot_to_prometheus(snapshot), rounds),
+    }
+
+def offscreen_manager():
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        return GalaxyManager(Sampler())
+    finally:
+        sys.stdout = stdout
+
+def bench_core_panel(rounds=200):
+    rng = random.Random(11)
+    results = {}
+    for cores, view in ((16, 'bars'), (96, 'grid'), (256, 'grid'), (256, 'package')):
+        manager = offscreen_manager()
+        manager.core_view = view
+        manager.history = History(60, cores=cores)
+        manager.draw_core_layout(18, 2)
+        manager.screen.render()
+        
+        def frame():
+            cpu = CpuSample(0, tuple(rng.random() * 100 for _ in range(cores)))
+            manager.history.add('cpu', cpu)
+            manager.update_cores(cpu, 18, 2)
+            manager.screen.render()
+        
+        results[f"{cores} cores, {manager.core_mode} view (ms)"] = measure(frame, rounds)
+        manager.sampler.stop()
+    return results
+
+def bench_recording(cores=64, samples=3600, codec='zlib', rounds=2000):
+    base = synthetic_snapshot(cores)
+    rng = random.Random(5)
+    net, disk, stats = base['net'], base['disk'], base['cpu_info'].stats
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.gxr')
+        recorder = Recorder(path, codec)
+        recorder.open_file(base['system'], cores)
+        start = base['time']
+        for i in range(samples):
+            snapshot = dict(base)
+            snapshot['time'] = start + i
+            snapshot['cpu'] = CpuSample(rng.random() * 100, tuple(rng.random() * 100 for _ in range(cores)))
+            snapshot['net'] = net._replace(counters=net.counters._replace(bytes_sent=net.counters.bytes_sent + i * rng.randint(0, 1 << 20)))
+            snapshot['disk'] = disk._replace(counters=disk.counters._replace(write_bytes=disk.counters.write_bytes + i * rng.randint(0, 1 << 22)))
+            snapshot['cpu_info'] = base['cpu_info']._replace(stats=stats._replace(ctx_switches=stats.ctx_switches + i * 5000))
+            recorder.append(snapshot)
+        recorder.close()
+        
+        size = os.path.getsize(path) + os.path.getsize(path + '.idx')
+        results[f"{codec} bytes per {cores}-core sample"] = size / samples
+        results["projected MB per day at 1Hz"] = size / samples * 86400 / 1024**2
+        
+        reader = RecordingReader(path)
+        results["random seek (ms)"] = measure(lambda: reader.snapshot_at(start + rng.random() * samples), rounds)
+        results[f"open, {reader.blocks} indexed blocks (ms)"] = measure(lambda: RecordingReader(path).close(), 50)
+        indexed = os.path.getsize(path + '.idx')
+        reader.close()
+        
+        def reopen_truncated():
+            os.truncate(path + '.idx', indexed // 2)
+            RecordingReader(path).close()
+        
+        results["open, index truncated to half (ms)"] = measure(reopen_truncated, 10)
+    return results
+
+def bench_collectors(rounds=500):
+    backends = ['psutil'] + (['proc'] if ProcReader.available() else [])
+    results = {}
+    for backend in backends:
+        sampler = Sampler(backend=backend)
+        for name in ('cpu', 'cpu_info', 'memory', 'net', 'disk'):
+            results[f"{backend} {name} (ms)"] = measure(sampler.collectors[name], rounds)
+        sampler.stop()
+    for backend in backends:
+        sampler = Sampler(backend=backend)
+        tick = [sampler.collectors[name] for name in ('cpu', 'cpu_info', 'memory', 'net', 'disk')]
+        results[f"{backend} full tick (ms)"] = measure(lambda: [collect() for collect in tick], rounds)
+        sampler.stop()
+    return results
+
+def bench_device_rates(devices=500, rounds=500):
+    rng = random.Random(13)
+    names = ('eth0', 'eth1', 'lo') + tuple(f"veth{i:04x}" for i in range(devices - 3))
+    counters = array('Q', (rng.randint(0, 1 << 40) for _ in range(2 * devices)))
+    busy = rng.sample(range(2 * devices), devices // 10)
+    
+    def tick():
+        for i in busy:
+            counters[i] += rng.randint(0, 1 << 20)
+        return array('Q', counters)
+    
+    def per_object():
+        current = {name: (counters[2 * i], counters[2 * i + 1]) for i, name in enumerate(names)}
+        rows = [NicRate(name, (sent - last[name][0]) / 1024, (recv - last[name][1]) / 1024) for name, (sent, recv) in current.items()]
+        last.update(current)
+        return sorted((row for row in rows if row.sent or row.recv or not row.name.startswith('veth')),
+                      key=lambda row: row.sent + row.recv, reverse=True)[:8]
+    
+    last = {name: (0, 0) for name in names}
+    rates = DeviceRates(NicRate, 1024)
+    rates.update(names, tick())
+    return {
+        f"dict deltas + sorted(), {devices} NICs (ms)": measure(lambda: (tick(), per_object()), rounds),
+        f"array deltas + nlargest, {devices} NICs (ms)": measure(lambda: rates.update(names, tick()), rounds),
+    }
+
+def bench_alerts(rules=300, cores=256, rounds=200):
+    rng = random.Random(17)
+    metrics = ('cpu.core', 'processes.cpu', 'processes.memory', 'cpu', 'memory', 'disk.write')
+    lines = [f"r{i}: {metrics[i % len(metrics)]} > {rng.randint(50, 99)} {rng.choice(('for', 'avg over'))} {rng.choice((10, 30, 60))}s"
+             for i in range(rules)]
+    engine = AlertEngine(parse_rules(lines))
+    snapshot = synthetic_snapshot(cores)
+    snapshot['process_series'] = tuple(ProcInfo(pid, f"proc-{pid}", rng.random() * 100, rng.random() * 5, 1, 'running') for pid in range(50))
+    clock = [snapshot['time']]
+    
+    def tick():
+        clock[0] += 1
+        snapshot['time'] = clock[0]
+        snapshot['cpu'] = CpuSample(rng.random() * 100, tuple(rng.random() * 100 for _ in range(cores)))
+        snapshot['process_series'] = tuple(snapshot['process_series'])
+        return engine.evaluate(snapshot)
+    
+    per_core = sum(1 for line in lines if 'cpu.core' in line)
+    return {
+        f"{rules} rules, {per_core} x {cores} core series (ms)": measure(tick, rounds),
+        "unchanged snapshot (ms)": measure(lambda: engine.evaluate(snapshot), rounds),
+    }
+
+def bench_adaptive_refresh(minutes=10, rounds=5000):
+    snapshot = synthetic_snapshot()
+    snapshot['cpu'] = CpuSample(5.0, (5.0,) * 16)
+    
+    def idle_frames(pacer):
+        clock, frames = 0.0, 0
+        while clock < minutes * 60:
+            snapshot['time'] = clock
+            clock += pacer.update(snapshot)
+            frames += 1
+        return frames / minutes
+    
+    pacer = AdaptiveRefresh()
+    clock = [0.0]
+    
+    def update():
+        clock[0] += 1
+        snapshot['time'] = clock[0]
+        return pacer.update(snapshot)
+    
+    return {
+        "fixed 1s, frames per idle minute": 60.0,
+        "auto, frames per idle minute": idle_frames(AdaptiveRefresh()),
+        "pacer update (ms)": measure(update, rounds),
+    }
+
+def bench_layout(rounds=200):
+    manager = offscreen_manager()
+    manager.sampler.snapshot = manager.sampler.collect_now()
+    sizes = [(120, 50), (160, 60)]
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    
+    def cold():
+        manager.static_cache.clear()
+        manager.draw_static_layout()
+    
+    def resize_frame(sizes):
+        sizes.reverse()
+        manager.resize(*sizes[0])
+        manager.update_dynamic_data()
+        return manager.screen.frame_bytes
+    
+    try:
+        results = {
+            "compute_layout (ms)": measure(lambda: compute_layout(160, 60), rounds),
+            "static layout, uncached (ms)": measure(cold, rounds),
+            "static layout, cached (ms)": measure(manager.draw_static_layout, rounds),
+            "resize + frame, grow/shrink (ms)": measure(lambda: resize_frame(sizes), rounds),
+        }
+        manager.resize(120, 50)
+        manager.update_dynamic_data()
+        results["bytes after grow 120x50 -> 120x56"] = resize_frame([(120, 56)])
+        manager.screen.invalidate()
+        manager.update_dynamic_data()
+        results["bytes for a full repaint at 120x56"] = manager.screen.frame_bytes
+        # Plugin panels must not push the I/O and process panels down; the process list ends where it would without them
+        panels = tuple((name, factory.rows) for name, factory in BUILTIN_PLUGINS.items())
+        for width, height in ((140, 50), (140, 60), (140, 70)):
+            rects = compute_layout(width, height, panels=panels)
+            bare = compute_layout(width, height)
+            assert rects['footer'] == bare['footer'], (width, height, rects['footer'], bare['footer'])
+            results[f"plugin panels placed at {width}x{height} (of {len(panels)})"] = sum(name.startswith('plugin.') for name in rects)
+    finally:
+        sys.stdout = stdout
+        manager.sampler.stop()
+    return results
+
+def bench_plugins(rounds=2000):
+    results = {}
+    for name, factory in BUILTIN_PLUGINS.items():
+        plugin = factory()
+        plugin.name = name
+        if not plugin.available():
+            continue
+        results[f"{name} collect, declared {plugin.cost:g} (ms)"] = measure(plugin.collect, rounds)
+        value = plugin.collect()
+        results[f"{name} render (ms)"] = measure(lambda: plugin.render(value), rounds)
+        plugin.close()
+    results["entry point scan (ms)"] = measure(plugin_entry_points, 20)
+    return results
+
+def bench_process_io(sockets=500, rounds=20):
+    # Extra loopback sockets make the host socket tables big enough for per-process parsing to show up
+    held = []
+    for _ in range(sockets):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(('127.0.0.1', 0))
+        held.append(sock)
+    try:
+        table = ProcessTable()
+        table.update()
+        pids = sorted(table.entries)
+        probe = lambda: table.probe_io(pids)
+        bounded = measure(probe, rounds)
+        
+        def full():
+            table.IO_ROTATION = len(pids)
+            try:
+                table.probe_io(pids)
+            finally:
+                del table.IO_ROTATION
+        
+        probed = [entry for entry in table.entries.values() if entry.last_io is not False]
+        full()
+        sample = [entry for entry in probed if entry.connections or entry.pid == os.getpid()]
+        per_process = lambda: [len(entry.proc.net_connections('inet')) for entry in sample]
+        
+        def shared():
+            inet = table.inet_inodes()
+            return [len(table.socket_inodes(entry.pid) & inet) for entry in sample]
+        
+        return {
+            f"bounded probe, {len(pids)} procs (ms)": bounded,
+            "probe every process (ms)": measure(full, max(rounds // 4, 1)),
+            f"{len(sample)} socket owners, net_connections() (ms)": measure(per_process, max(rounds // 4, 1)),
+            f"{len(sample)} socket owners, one table scan (ms)": measure(shared, max(rounds // 4, 1)),
+            "full update incl. bounded probe (ms)": measure(table.update, max(rounds // 4, 1)),
+            "updates per full rotation": -(-len(probed) // ProcessTable.IO_ROTATION),
+        }
+    finally:
+        for sock in held:
+            sock.close()
+
+def bench_fleet(timeout=15.0):
+    # Loopback agents run as real subprocesses; the aggregator must get HELLO and SNAPSHOT frames and reconnect after a restart
+    here = os.path.dirname(os.path.abspath(__file__))
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    with tempfile.TemporaryDirectory() as tmp:
+        endpoints = [f"127.0.0.1:{port}", f"unix:{os.path.join(tmp, 'agent.sock')}"]
+        spawn = lambda endpoint: subprocess.Popen([sys.executable, 'main.py', '--agent', endpoint, '--refresh', '0.25'], cwd=here,
+                                                  stdout=subprocess.DEVNULL)
+        agents = [spawn(endpoint) for endpoint in endpoints]
+        aggregator = Aggregator([parse_endpoint(endpoint) for endpoint in endpoints])
+        
+        def wait_for(check, what):
+            deadline = time.monotonic() + timeout
+            while not all(check(host) for host in aggregator.hosts):
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"fleet: no {what} within {timeout:g}s: "
+                                       + ', '.join(f"{host.address} {host.error or 'silent'}" for host in aggregator.hosts))
+                time.sleep(0.01)
+            return (time.monotonic() - start) * 1000
+        
+        try:
+            start = time.monotonic()
+            aggregator.start()
+            hello = wait_for(lambda host: host.system is not None, 'HELLO')
+            first = wait_for(lambda host: host.frames and host.snapshot.get('cpu'), 'SNAPSHOT')
+            frames = {host.address: host.frames for host in aggregator.hosts}
+            for agent in agents:
+                agent.terminate()
+                agent.wait()
+            wait_for(lambda host: not host.connected, 'disconnect')
+            start = time.monotonic()
+            agents = [spawn(endpoint) for endpoint in endpoints]
+            reconnect = wait_for(lambda host: host.connected and host.frames > frames[host.address], 'SNAPSHOT after restart')
+        finally:
+            aggregator.stop()
+            for agent in agents:
+                agent.terminate()
+                agent.wait()
+    return {
+        "first HELLO from tcp and unix agents (ms)": hello,
+        "first SNAPSHOT (ms)": first,
+        "SNAPSHOT again after agent restart (ms)": reconnect,
+    }
+
+def bench_startup(rounds=5):
+    here = os.path.dirname(os.path.abspath(__file__))
+    run = lambda code: subprocess.run([sys.executable, '-c', code], cwd=here, check=True)
+    interpreter = measure(lambda: run('pass'), rounds)
+    
+    def first_frame():
+        stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            manager = GalaxyManager(Sampler())
+            manager.screen.reset = True
+            manager.draw_static_layout()
+            manager.update_dynamic_data()
+        finally:
+            sys.stdout = stdout
+            manager.sampler.stop()
+    
+    def first_rates():
+        sampler = Sampler()
+        sampler.start()
+        try:
+            while not (sampler.snapshot.get('cpu') and sampler.snapshot.get('net') and sampler.snapshot['net'].rates):
+                time.sleep(0.005)
+        finally:
+            sampler.stop()
+    
+    return {
+        "python -c pass (ms)": interpreter,
+        "import main, over baseline (ms)": measure(lambda: run('import main'), rounds) - interpreter,
+        "first frame, in process (ms)": measure(first_frame, rounds),
+        "first valid CPU and network rates (ms)": measure(first_rates, rounds),
+    }
+
+BENCHMARKS = {
+    'process_top': bench_process_top,
+    'snapshot_export': bench_snapshot_export,
+    'core_panel': bench_core_panel,
+    'recording': bench_recording,
+    'collectors': bench_collectors,
+    'device_rates': bench_device_rates,
+    'alerts': bench_alerts,
+    'process_groups': bench_process_groups,
+    'adaptive_refresh': bench_adaptive_refresh,
+    'layout': bench_layout,
+    'plugins': bench_plugins,
+    'fleet': bench_fleet,
+    'process_io': bench_process_io,
+    'startup': bench_startup,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Galaxy Manager benchmarks")
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    
+    for name in args.names or BENCHMARKS:
+        print(f"{name}:")
+        for label, value in BENCHMARKS[name]().items():
+            print(f"  {label:<44} {value:10.3f}")
+
+if __name__ == "__main__":
+    main()
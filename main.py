@@ -4,6 +4,32 @@ import time
 from datetime import datetime
 import platform
 import shutil
+import glob
+import sys
+import re
+import unicodedata
+import threading
+import argparse
+import random
+import heapq
+import bisect
+from array import array
+import json
+import struct
+import zlib
+import mmap
+import select
+import signal
+import queue
+from operator import add, attrgetter, ge, gt, le, lt, sub
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 class Colors:
     RESET = '\033[0m'
@@ -16,38 +42,1146 @@ class Colors:
     WHITE = '\033[97m'
     BOLD = '\033[1m'
     DIM = '\033[2m'
+    REVERSE = '\033[7m'
     CLEAR_LINE = '\033[K'
+    CLEAR_SCREEN = '\033[2J'
     HIDE_CURSOR = '\033[?25l'
     SHOW_CURSOR = '\033[?25h'
+    REPORT_FOCUS = '\033[?1004h'
+    IGNORE_FOCUS = '\033[?1004l'
 
 def move_cursor(row, col):
     return f'\033[{row};{col}H'
 
-class GalaxyManager:
-    def __init__(self):
+ANSI_RE = re.compile(r'\033\[([0-9;?]*)([A-Za-z])')
+
+BLANK_CELL = (' ', '')
+
+class ScreenBuffer:
+    RUN_GAP = 4
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.back = [[BLANK_CELL] * width for _ in range(height)]
+        self.front = [[BLANK_CELL] * width for _ in range(height)]
+        self.reset = False
+        self.frames = 0
+        self.frame_bytes = 0
+        self.total_bytes = 0
+        self.frame_naive_bytes = 0
+        self.total_naive_bytes = 0
+        self.pending_naive_bytes = 0
+
+    def invalidate(self):
+        self.front = [[None] * self.width for _ in range(self.height)]
+
+    def resize(self, width, height):
+        keep = width >= self.width and height >= self.height
+        front = self.front
+        self.width = width
+        self.height = height
+        self.back = [[BLANK_CELL] * width for _ in range(height)]
+        if keep:
+            # Terminals leave existing cells in place when they grow, so the diff only repaints what moved or was exposed
+            self.front = [row + [None] * (width - len(row)) for row in front] + [[None] * width for _ in range(height - len(front))]
+        else:
+            self.invalidate()
+            self.reset = True
+        return keep
+
+    def put(self, row, col, content):
+        self.pending_naive_bytes += len(move_cursor(row, col)) + len(content.encode('utf-8'))
+        r = row - 1
+        if r < 0 or r >= self.height:
+            return
+        line = self.back[r]
+        c = col - 1
+        style = ''
+        pos = 0
+        for match in ANSI_RE.finditer(content):
+            c = self._put_text(line, c, content[pos:match.start()], style)
+            if match.group(2) == 'm':
+                if match.group(1) in ('', '0'):
+                    style = ''
+                else:
+                    style += match.group(0)
+            pos = match.end()
+        self._put_text(line, c, content[pos:], style)
+
+    def _put_text(self, line, c, text, style):
+        width = self.width
+        for ch in text:
+            wide = unicodedata.east_asian_width(ch) in ('W', 'F')
+            span = 2 if wide else 1
+            if c >= 0 and c + span <= width:
+                if line[c][0] == '' and c > 0:
+                    line[c - 1] = (' ', line[c - 1][1])
+                end = c + span
+                if end < width and line[end][0] == '':
+                    line[end] = (' ', line[end][1])
+                line[c] = (ch, style)
+                if wide:
+                    line[c + 1] = ('', style)
+            c += span
+        return c
+
+    def render(self):
+        out = []
+        if self.reset:
+            out.append(Colors.CLEAR_SCREEN)
+            self.reset = False
+        width = self.width
+        gap = self.RUN_GAP
+        for r in range(self.height):
+            back = self.back[r]
+            front = self.front[r]
+            if back == front:
+                continue
+            c = 0
+            while c < width:
+                if back[c] == front[c]:
+                    c += 1
+                    continue
+                start = c
+                end = c
+                j = c + 1
+                while j < width and j - end <= gap:
+                    if back[j] != front[j]:
+                        end = j
+                    j += 1
+                if back[start][0] == '' and start > 0:
+                    start -= 1
+                if end + 1 < width and back[end + 1][0] == '':
+                    end += 1
+                out.append(move_cursor(r + 1, start + 1))
+                style = None
+                for ch, st in back[start:end + 1]:
+                    if ch == '':
+                        continue
+                    if st != style:
+                        out.append(Colors.RESET + st)
+                        style = st
+                    out.append(ch)
+                if style:
+                    out.append(Colors.RESET)
+                c = end + 1
+            self.front[r] = back[:]
+        return ''.join(out)
+
+    def clear(self):
+        self.back = [[BLANK_CELL] * self.width for _ in range(self.height)]
+
+    def flush(self):
+        self.write(self.render())
+
+    def write(self, data):
+        self.frames += 1
+        self.frame_bytes = len(data.encode('utf-8'))
+        self.total_bytes += self.frame_bytes
+        self.frame_naive_bytes = self.pending_naive_bytes
+        self.total_naive_bytes += self.pending_naive_bytes
+        self.pending_naive_bytes = 0
+        if data:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+
+CpuSample = namedtuple('CpuSample', ['total', 'percpu'])
+CpuInfo = namedtuple('CpuInfo', ['freq', 'stats'])
+SystemInfo = namedtuple('SystemInfo', ['os', 'boot_time', 'physical_cores', 'logical_cores'])
+MemorySample = namedtuple('MemorySample', ['virtual', 'swap'])
+RateSample = namedtuple('RateSample', ['counters', 'rates'])
+ProcInfo = namedtuple('ProcInfo', ['pid', 'name', 'cpu_percent', 'memory_percent', 'num_threads', 'status', 'read_rate', 'write_rate',
+                                   'connections'], defaults=(None, None, None))
+ProcGroup = namedtuple('ProcGroup', ['key', 'name', 'depth', 'cpu_percent', 'memory_percent', 'num_threads', 'count', 'expanded'])
+CpuFreq = namedtuple('CpuFreq', ['current', 'min', 'max'])
+CpuStats = namedtuple('CpuStats', ['ctx_switches', 'interrupts', 'soft_interrupts', 'syscalls'])
+VirtualMemory = namedtuple('VirtualMemory', ['total', 'available', 'percent', 'used', 'free', 'cached', 'buffers'])
+SwapMemory = namedtuple('SwapMemory', ['total', 'used', 'free', 'percent'])
+NetIO = namedtuple('NetIO', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv', 'errin', 'errout'])
+DiskIO = namedtuple('DiskIO', ['read_count', 'write_count', 'read_bytes', 'write_bytes'])
+Battery = namedtuple('Battery', ['percent', 'secsleft', 'power_plugged'])
+NicRate = namedtuple('NicRate', ['name', 'sent', 'recv'])
+DiskRate = namedtuple('DiskRate', ['name', 'read', 'write'])
+
+PROC_FD = os.path.isdir('/proc/self/fd')
+
+def read_cgroup(pid):
+    try:
+        with open(f'/proc/{pid}/cgroup', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return '-'
+    paths = {}
+    for line in lines:
+        _, controllers, path = line.split(':', 2)
+        paths[controllers] = path
+    # cgroup v2 has a single '0::' line; on v1 prefer the cpu hierarchy
+    if '' in paths:
+        return paths['']
+    for controllers, path in paths.items():
+        if 'cpu' in controllers.split(','):
+            return path
+    return next(iter(paths.values()), '-')
+
+class ProcEntry:
+    __slots__ = ('proc', 'pid', 'name', 'cpu', 'memory', 'threads', 'status', 'ppid', 'user', 'cgroup',
+                 'read_rate', 'write_rate', 'connections', 'last_io', 'last_cpu')
+
+    def __init__(self, proc, pid, name, ppid=0, user='?', cgroup='-', cpu=0.0, memory=0.0, threads=0, status=''):
+        self.proc = proc
+        self.pid = pid
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.threads = threads
+        self.status = status
+        self.ppid = ppid
+        self.user = user
+        self.cgroup = cgroup
+        self.read_rate = 0.0
+        self.write_rate = 0.0
+        self.connections = 0
+        # (read_bytes, write_bytes, monotonic time) of the last I/O probe, or False once the counters proved unreadable
+        self.last_io = None
+        # (cpu seconds, monotonic time) of the last /proc read, for the ProcReader path
+        self.last_cpu = None
+
+    def info(self):
+        return ProcInfo(self.pid, self.name, self.cpu, self.memory, self.threads, self.status,
+                        self.read_rate, self.write_rate, self.connections)
+
+class ProcessTable:
+    SORT_KEYS = {
+        'cpu': attrgetter('cpu'),
+        'memory': attrgetter('memory'),
+        'threads': attrgetter('threads'),
+        'io': lambda entry: entry.read_rate + entry.write_rate,
+        'connections': attrgetter('connections'),
+    }
+    IO_SORTS = ('io', 'connections')
+    ROLLUP_KEYS = {'cpu': 0, 'memory': 1, 'threads': 2}
+    GROUP_KINDS = ('user', 'cgroup')
+    GROUP_MEMBERS = 20
+    MAX_DEPTH = 64
+    # Each update probes the top_n leaders by CPU, I/O and connections plus IO_ROTATION PIDs taken in turn, so a full pass
+    # over N processes takes N / IO_ROTATION updates
+    IO_ROTATION = 8
+    SOCKET_TABLES = ('/proc/net/tcp', '/proc/net/tcp6', '/proc/net/udp', '/proc/net/udp6')
+
+    def __init__(self, top_n=5, reader=None):
+        self.top_n = top_n
+        self.reader = reader
+        self.entries = {}
+        self.ignored = set()
+        self.total_memory = psutil.virtual_memory().total
+        # Rollups are [cpu, memory, threads, processes] and are kept current by applying deltas
+        self.children = {}
+        self.subtree = {}
+        self.groups = {kind: {} for kind in self.GROUP_KINDS}
+        self.members = {kind: {} for kind in self.GROUP_KINDS}
+        self.io_cursor = 0
+
+    def update(self):
+        pids = psutil.pids()
+        entries = self.entries
+        alive = set(pids)
+        for pid in entries.keys() - alive:
+            self.remove(pid)
+        self.ignored &= alive
+        
+        reader = self.reader
+        now = time.monotonic()
+        for pid in pids:
+            entry = entries.get(pid)
+            if entry is None:
+                if pid in self.ignored:
+                    continue
+                entry = self.add(pid)
+                if entry is None:
+                    continue
+            try:
+                if reader:
+                    # One read of /proc/<pid>/stat instead of psutil's stat, statm and status files
+                    entry.status, ppid, cpu_time, threads, rss = reader.process_stat(pid)
+                    last = entry.last_cpu
+                    cpu = round((cpu_time - last[0]) * 100 / (now - last[1]), 1) if last and now > last[1] else 0.0
+                    entry.last_cpu = (cpu_time, now)
+                else:
+                    proc = entry.proc
+                    with proc.oneshot():
+                        cpu = proc.cpu_percent(interval=None)
+                        rss = proc.memory_info().rss
+                        threads = proc.num_threads()
+                        entry.status = proc.status()
+                        ppid = proc.ppid()
+            except:
+                self.remove(pid)
+                continue
+            memory = rss * 100 / self.total_memory
+            if ppid != entry.ppid:
+                self.reparent(entry, ppid)
+            self.set_values(entry, cpu, memory, threads)
+        self.probe_io(pids)
+
+    def probe_io(self, pids):
+        entries = self.entries
+        probes = {}
+        for key in ('cpu',) + self.IO_SORTS:
+            score = self.SORT_KEYS[key]
+            for entry in heapq.nlargest(self.top_n, entries.values(), key=score):
+                if score(entry) and entry.last_io is not False:
+                    probes[entry.pid] = entry
+        # The cursor is the last PID probed, so the rotation survives PIDs coming and going
+        start = bisect.bisect_right(pids, self.io_cursor)
+        rotated = 0
+        for i in range(len(pids)):
+            if rotated >= self.IO_ROTATION:
+                break
+            pid = pids[(start + i) % len(pids)]
+            entry = entries.get(pid)
+            if entry is not None and entry.last_io is not False and pid not in probes:
+                probes[pid] = entry
+                self.io_cursor = pid
+                rotated += 1
+        
+        now = time.monotonic()
+        inet = None
+        for entry in probes.values():
+            proc = entry.proc
+            try:
+                io = proc.io_counters()
+                if PROC_FD:
+                    # proc.net_connections() would parse every socket table on the host once per probed process
+                    sockets = self.socket_inodes(entry.pid)
+                    if sockets and inet is None:
+                        inet = self.inet_inodes()
+                    connections = len(sockets & inet) if sockets else 0
+                else:
+                    connections = len(proc.net_connections('inet'))
+            except psutil.NoSuchProcess:
+                continue
+            except:
+                # Access denied or unsupported on this platform: stop probing it
+                entry.read_rate, entry.write_rate, entry.connections, entry.last_io = 0.0, 0.0, 0, False
+                continue
+            last = entry.last_io
+            if last and now > last[2]:
+                elapsed = now - last[2]
+                entry.read_rate = max(io.read_bytes - last[0], 0) / elapsed
+                entry.write_rate = max(io.write_bytes - last[1], 0) / elapsed
+            entry.connections = connections
+            entry.last_io = (io.read_bytes, io.write_bytes, now)
+
+    @staticmethod
+    def socket_inodes(pid):
+        path = f"/proc/{pid}/fd"
+        inodes = set()
+        for fd in os.listdir(path):
+            try:
+                link = os.readlink(f"{path}/{fd}")
+            except OSError:
+                continue
+            if link.startswith('socket:['):
+                inodes.add(link[8:-1])
+        return inodes
+
+    def inet_inodes(self):
+        inodes = set()
+        for table in self.SOCKET_TABLES:
+            try:
+                with open(table, encoding='ascii') as f:
+                    next(f, None)
+                    inodes.update(line.split()[9] for line in f)
+            except OSError:
+                pass
+        return inodes
+
+    def add(self, pid):
+        try:
+            proc = psutil.Process(pid)
+            name = proc.name()
+            ppid = proc.ppid()
+            if self.reader is None:
+                proc.cpu_percent(interval=None)
+        except:
+            return None
+        if not name or 'System Idle Process' in name:
+            self.ignored.add(pid)
+            return None
+        try:
+            user = proc.username()
+        except:
+            user = '?'
+        entry = ProcEntry(proc, pid, name, ppid, user, read_cgroup(pid))
+        self.insert(entry)
+        return entry
+
+    def insert(self, entry):
+        pid = entry.pid
+        self.entries[pid] = entry
+        self.link(entry)
+        own = [entry.cpu, entry.memory, entry.threads, 1]
+        total = list(own)
+        for child in self.children.get(pid, ()):
+            self.accumulate(total, self.subtree[child], 1)
+        self.subtree[pid] = total
+        self.propagate(entry.ppid, pid, total, 1)
+        for kind in self.GROUP_KINDS:
+            group = getattr(entry, kind)
+            self.accumulate(self.groups[kind].setdefault(group, [0.0, 0.0, 0, 0]), own, 1)
+            self.members[kind].setdefault(group, set()).add(pid)
+
+    def remove(self, pid):
+        entry = self.entries.pop(pid)
+        self.propagate(entry.ppid, pid, self.subtree.pop(pid), -1)
+        self.unlink(entry)
+        own = (entry.cpu, entry.memory, entry.threads, 1)
+        for kind in self.GROUP_KINDS:
+            name = getattr(entry, kind)
+            group = self.groups[kind][name]
+            self.accumulate(group, own, -1)
+            if group[3] <= 0:
+                del self.groups[kind][name]
+                del self.members[kind][name]
+            else:
+                self.members[kind][name].discard(pid)
+
+    def reparent(self, entry, ppid):
+        pid = entry.pid
+        total = self.subtree[pid]
+        self.propagate(entry.ppid, pid, total, -1)
+        self.unlink(entry)
+        entry.ppid = ppid
+        self.link(entry)
+        self.propagate(ppid, pid, total, 1)
+
+    def link(self, entry):
+        # Processes that are their own parent are filed under None so they still show up as roots
+        ppid = entry.ppid if entry.ppid != entry.pid else None
+        self.children.setdefault(ppid, set()).add(entry.pid)
+
+    def unlink(self, entry):
+        ppid = entry.ppid if entry.ppid != entry.pid else None
+        siblings = self.children.get(ppid)
+        if siblings is not None:
+            siblings.discard(entry.pid)
+            if not siblings:
+                del self.children[ppid]
+
+    def set_values(self, entry, cpu, memory, threads):
+        delta = (cpu - entry.cpu, memory - entry.memory, threads - entry.threads, 0)
+        if not (delta[0] or delta[1] or delta[2]):
+            return
+        entry.cpu = cpu
+        entry.memory = memory
+        entry.threads = threads
+        pid = entry.pid
+        self.accumulate(self.subtree[pid], delta, 1)
+        self.propagate(entry.ppid, pid, delta, 1)
+        for kind in self.GROUP_KINDS:
+            self.accumulate(self.groups[kind][getattr(entry, kind)], delta, 1)
+
+    @staticmethod
+    def accumulate(target, delta, sign):
+        target[0] += sign * delta[0]
+        target[1] += sign * delta[1]
+        target[2] += sign * delta[2]
+        target[3] += sign * delta[3]
+
+    def propagate(self, ppid, pid, delta, sign):
+        subtree = self.subtree
+        entries = self.entries
+        cpu, memory, threads, count = sign * delta[0], sign * delta[1], sign * delta[2], sign * delta[3]
+        for _ in range(self.MAX_DEPTH):
+            node = subtree.get(ppid)
+            if node is None or ppid == pid:
+                return
+            node[0] += cpu
+            node[1] += memory
+            node[2] += threads
+            node[3] += count
+            pid, ppid = ppid, entries[ppid].ppid
+
+    def group_rows(self, view, key='cpu', toggled=(), limit=100):
+        index = self.ROLLUP_KEYS.get(key, 0)
+        member_key = self.SORT_KEYS[key]
+        entries = self.entries
+        rows = []
+        if view == 'tree':
+            subtree = self.subtree
+            order = lambda pid: subtree[pid][index]
+            roots = [pid for ppid, children in self.children.items() if ppid not in subtree for pid in children]
+            stack = [(pid, 0) for pid in reversed(heapq.nlargest(limit, roots, key=order))]
+            while stack and len(rows) < limit:
+                pid, depth = stack.pop()
+                total = subtree[pid]
+                children = self.children.get(pid)
+                # Top-level nodes start expanded, everything below starts collapsed
+                expanded = ((depth == 0) != (pid in toggled)) if children else None
+                rows.append(ProcGroup(pid, entries[pid].name, depth, total[0], total[1], total[2], total[3], expanded))
+                if expanded:
+                    stack.extend((child, depth + 1) for child in reversed(heapq.nlargest(limit, children, key=order)))
+            return tuple(rows)
+        
+        groups = self.groups[view]
+        members = self.members[view]
+        for name in heapq.nlargest(limit, groups, key=lambda group: groups[group][index]):
+            total = groups[name]
+            expanded = name in toggled
+            rows.append(ProcGroup(name, name, 0, total[0], total[1], total[2], total[3], expanded))
+            if expanded:
+                for pid in heapq.nlargest(self.GROUP_MEMBERS, members[name], key=lambda pid: member_key(entries[pid])):
+                    entry = entries[pid]
+                    rows.append(ProcGroup(pid, entry.name, 1, entry.cpu, entry.memory, entry.threads, 1, None))
+            if len(rows) >= limit:
+                break
+        return tuple(rows[:limit])
+
+    def top(self, n=5, key='cpu'):
+        return tuple(entry.info() for entry in heapq.nlargest(n, self.entries.values(), key=self.SORT_KEYS[key]))
+
+class ProcReader:
+    PATHS = {
+        'stat': '/proc/stat',
+        'meminfo': '/proc/meminfo',
+        'net': '/proc/net/dev',
+        'disk': '/proc/diskstats',
+    }
+    MEMINFO_KEYS = (b'MemTotal', b'MemFree', b'MemAvailable', b'Buffers', b'Cached', b'SReclaimable', b'SwapTotal', b'SwapFree')
+    SECTOR_SIZE = 512
+    # /proc/<pid>/stat state letters, named the way psutil names them
+    PROCESS_STATES = {b'R': 'running', b'S': 'sleeping', b'D': 'disk-sleep', b'T': 'stopped', b't': 'tracing-stop', b'Z': 'zombie',
+                      b'X': 'dead', b'x': 'dead', b'K': 'wake-kill', b'W': 'waking', b'I': 'idle', b'P': 'parked'}
+
+    def __init__(self, read_size=16384):
+        self.fds = {}
+        self.sizes = {}
+        for key, path in self.PATHS.items():
+            self.fds[key] = os.open(path, os.O_RDONLY)
+            self.sizes[key] = read_size
+        self.disks = set(os.listdir('/sys/block'))
+        # diskstats names known not to be whole disks (partitions, dm slices), so only new names trigger a rescan
+        self.partitions = set()
+        self.ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.last_cpu = None
+        self.cpu_lock = threading.Lock()
+
+    @classmethod
+    def available(cls):
+        return (sys.platform.startswith('linux') and hasattr(os, 'pread')
+                and all(os.access(path, os.R_OK) for path in cls.PATHS.values()) and os.path.isdir('/sys/block'))
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds.clear()
+
+    def read(self, key):
+        # pread at offset 0 needs no seek, so concurrent collectors can share a descriptor without a lock
+        fd = self.fds[key]
+        size = self.sizes[key]
+        while True:
+            data = os.pread(fd, size, 0)
+            if len(data) < size:
+                return data
+            size = self.sizes[key] = size * 2
+
+    def read_stat(self):
+        cpus = []
+        stats = [0, 0, 0]
+        for line in self.read('stat').split(b'\n'):
+            if line.startswith(b'cpu'):
+                # user nice system idle iowait irq softirq steal; guest time is already counted in user/nice
+                values = [int(v) for v in line.split(None, 9)[1:9]]
+                total = sum(values)
+                cpus.append((total - values[3] - values[4], total))
+            elif line.startswith(b'ctxt'):
+                stats[0] = int(line.split()[1])
+            elif line.startswith(b'intr'):
+                stats[1] = int(line.split(None, 2)[1])
+            elif line.startswith(b'softirq'):
+                stats[2] = int(line.split(None, 2)[1])
+        return cpus, CpuStats(*stats, 0)
+
+    def cpu_percent(self):
+        cpus = self.read_stat()[0]
+        with self.cpu_lock:
+            last, self.last_cpu = self.last_cpu, cpus
+        if not last or len(last) != len(cpus):
+            return CpuSample(0.0, (0.0,) * (len(cpus) - 1))
+        percents = []
+        for (busy, total), (last_busy, last_total) in zip(cpus, last):
+            delta = total - last_total
+            percents.append(round(min(max((busy - last_busy) / delta * 100, 0.0), 100.0), 1) if delta > 0 else 0.0)
+        return CpuSample(percents[0], tuple(percents[1:]))
+
+    def cpu_stats(self):
+        return self.read_stat()[1]
+
+    def process_stat(self, pid):
+        # (status, ppid, cpu seconds, threads, rss bytes); the name may hold spaces or ')' so fields start after the last ')'
+        fd = os.open(f"/proc/{pid}/stat", os.O_RDONLY)
+        try:
+            data = os.read(fd, 4096)
+        finally:
+            os.close(fd)
+        fields = data[data.rindex(b')') + 2:].split()
+        return (self.PROCESS_STATES.get(fields[0], '?'), int(fields[1]), (int(fields[11]) + int(fields[12])) / self.ticks,
+                int(fields[17]), int(fields[21]) * self.page_size)
+
+    def memory(self):
+        values = dict.fromkeys(self.MEMINFO_KEYS, 0)
+        for line in self.read('meminfo').split(b'\n'):
+            key, _, rest = line.partition(b':')
+            if key in values:
+                values[key] = int(rest.split()[0]) * 1024
+        total, free, buffers = values[b'MemTotal'], values[b'MemFree'], values[b'Buffers']
+        available = values[b'MemAvailable'] or free
+        cached = values[b'Cached'] + values[b'SReclaimable']
+        used = total - available
+        percent = round((total - available) / total * 100, 1) if total else 0.0
+        virtual = VirtualMemory(total, available, percent, used, free, cached, buffers)
+        swap_total, swap_free = values[b'SwapTotal'], values[b'SwapFree']
+        swap_used = swap_total - swap_free
+        swap = SwapMemory(swap_total, swap_used, swap_free, round(swap_used / swap_total * 100, 1) if swap_total else 0.0)
+        return MemorySample(virtual, swap)
+
+    def net_io_counters(self):
+        totals = [0] * 6
+        for line in self.read('net').split(b'\n')[2:]:
+            name, _, rest = line.partition(b':')
+            fields = rest.split()
+            if len(fields) < 12:
+                continue
+            totals[0] += int(fields[8])
+            totals[1] += int(fields[0])
+            totals[2] += int(fields[9])
+            totals[3] += int(fields[1])
+            totals[4] += int(fields[2])
+            totals[5] += int(fields[10])
+        return NetIO(*totals)
+
+    def is_disk(self, name):
+        # /sys/block lists whole disks only; rescan it when diskstats shows a name we have not classified, e.g. a hot-plugged disk
+        key = name.replace('/', '!')
+        if key in self.disks:
+            return True
+        if key in self.partitions:
+            return False
+        self.disks = set(os.listdir('/sys/block'))
+        if key in self.disks:
+            return True
+        self.partitions.add(key)
+        return False
+
+    def disk_io_counters(self):
+        totals = [0] * 4
+        found = False
+        for line in self.read('disk').split(b'\n'):
+            fields = line.split()
+            if len(fields) < 10 or not self.is_disk(fields[2].decode()):
+                continue
+            found = True
+            totals[0] += int(fields[3])
+            totals[1] += int(fields[7])
+            totals[2] += int(fields[5]) * self.SECTOR_SIZE
+            totals[3] += int(fields[9]) * self.SECTOR_SIZE
+        return DiskIO(*totals) if found else None
+
+    def net_io_per_device(self):
+        names = []
+        counters = array('Q')
+        for line in self.read('net').split(b'\n')[2:]:
+            name, _, rest = line.partition(b':')
+            fields = rest.split()
+            if len(fields) < 12:
+                continue
+            names.append(name.strip().decode())
+            counters.append(int(fields[8]))
+            counters.append(int(fields[0]))
+        return tuple(names), counters
+
+    def disk_io_per_device(self):
+        names = []
+        counters = array('Q')
+        for line in self.read('disk').split(b'\n'):
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            name = fields[2].decode()
+            if not self.is_disk(name):
+                continue
+            names.append(name)
+            counters.append(int(fields[5]) * self.SECTOR_SIZE)
+            counters.append(int(fields[9]) * self.SECTOR_SIZE)
+        return tuple(names), counters
+
+class DeviceRates:
+    VIRTUAL = ('veth', 'loop')
+
+    def __init__(self, row_type, scale, rows=8):
+        self.row_type = row_type
+        self.scale = scale
+        self.rows = rows
+        self.names = ()
+        self.weights = array('d')
+        self.counters = None
+        self.last = None
+
+    def realign(self, names, counters):
+        # Devices come and go (container veths); carry known counters over so only new ones miss a tick
+        index = {name: i for i, name in enumerate(self.names)}
+        old = array('Q', counters)
+        for i, name in enumerate(names):
+            j = index.get(name)
+            if j is not None:
+                old[2 * i] = self.counters[2 * j]
+                old[2 * i + 1] = self.counters[2 * j + 1]
+        self.names = names
+        # Idle virtual devices weigh nothing, so they sort last and are dropped below
+        self.weights = array('d', (0.0 if name == 'lo' or name.startswith(self.VIRTUAL) else 0.5 for name in names))
+        return old
+
+    def update(self, names, counters):
+        now = time.monotonic()
+        old = self.counters
+        if old is not None and names != self.names:
+            old = self.realign(names, counters)
+        elif old is None:
+            self.realign(names, counters)
+        last, self.counters, self.last = self.last, counters, now
+        if old is None or now <= last:
+            return None
+        
+        deltas = array('q', map(sub, counters, old))
+        keys = array('d', map(add, map(add, deltas[0::2], deltas[1::2]), self.weights))
+        scale = (now - last) * self.scale
+        rows = []
+        for i in heapq.nlargest(self.rows, range(len(names)), key=keys.__getitem__):
+            if keys[i] <= 0:
+                break
+            rows.append(self.row_type(names[i], max(deltas[2 * i], 0) / scale, max(deltas[2 * i + 1], 0) / scale))
+        return tuple(rows)
+
+class Profiler:
+    BUCKETS = 40
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.timings = {}
+        self.lock = threading.Lock()
+        self.process = psutil.Process()
+        self.started = (time.monotonic(), time.process_time())
+        self.window = self.started
+        self.recent_cpu = 0.0
+        self.startup = {}
+        self.screen = None
+
+    def record(self, name, elapsed):
+        bucket = min(elapsed.bit_length(), self.BUCKETS - 1)
+        with self.lock:
+            entry = self.timings.get(name)
+            if entry is None:
+                entry = self.timings[name] = [0, 0, 0, array('Q', bytes(8 * self.BUCKETS))]
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+            entry[3][bucket] += 1
+
+    def mark(self, name):
+        self.startup[name] = round((time.monotonic() - self.started[0]) * 1000, 1)
+
+    def timed(self, name, fn, *args):
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args)
+        finally:
+            self.record(name, time.perf_counter_ns() - start)
+
+    @staticmethod
+    def percentile(buckets, count, q):
+        # Buckets are powers of two in nanoseconds, so this is an upper bound within 2x
+        target = count * q
+        seen = 0
+        for bucket, n in enumerate(buckets):
+            seen += n
+            if n and seen >= target:
+                return round((1 << bucket) / 1000, 1)
+        return 0.0
+
+    def summary(self):
+        with self.lock:
+            timings = {name: (count, total, peak, array('Q', buckets)) for name, (count, total, peak, buckets) in self.timings.items()}
+        elapsed = max(time.monotonic() - self.started[0], 1e-9)
+        result = {}
+        for name, (count, total, peak, buckets) in sorted(timings.items()):
+            result[name] = {
+                'count': count,
+                'mean_us': round(total / count / 1000, 1),
+                'p50_us': self.percentile(buckets, count, 0.5),
+                'p95_us': self.percentile(buckets, count, 0.95),
+                'p99_us': self.percentile(buckets, count, 0.99),
+                'max_us': round(peak / 1000, 1),
+                'ms_per_s': round(total / 1e6 / elapsed, 3),
+                'histogram_log2_ns': buckets.tolist(),
+            }
+        return result
+
+    def usage(self):
+        now = (time.monotonic(), time.process_time())
+        if now[0] - self.window[0] >= 1.0:
+            self.recent_cpu = (now[1] - self.window[1]) / (now[0] - self.window[0]) * 100
+            self.window = now
+        elapsed = now[0] - self.started[0]
+        return {
+            'elapsed': round(elapsed, 3),
+            'cpu_percent': round(self.recent_cpu, 2),
+            'avg_cpu_percent': round((now[1] - self.started[1]) / elapsed * 100, 2) if elapsed > 0 else 0.0,
+            'rss_bytes': self.process.memory_info().rss,
+        }
+
+    def output(self):
+        screen = self.screen
+        if screen is None or not screen.frames:
+            return None
+        # 'naive' is what redrawing every update_at() call would have written, which is what the diff renderer replaced
+        naive = screen.total_naive_bytes
+        return {
+            'frames': screen.frames,
+            'bytes_per_frame': round(screen.total_bytes / screen.frames),
+            'naive_bytes_per_frame': round(naive / screen.frames),
+            'total_bytes': screen.total_bytes,
+            'saved_percent': round(100 - screen.total_bytes * 100 / naive, 1) if naive else 0.0,
+        }
+
+    def over_budget(self, usage=None):
+        usage = usage or self.usage()
+        return self.budget is not None and usage['avg_cpu_percent'] > self.budget
+
+    def dump(self, path):
+        usage = self.usage()
+        data = {'usage': usage, 'budget_percent': self.budget, 'over_budget': self.over_budget(usage), 'startup_ms': self.startup,
+                'output': self.output(), 'timings': self.summary()}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+
+class AdaptiveRefresh:
+    MINIMUM = 0.25
+    MAXIMUM = 10.0
+    BACKOFF = 1.5
+    CPU_STEP = 10.0
+    CPU_HOT = 80.0
+    CORE_HOT = 95.0
+    MEMORY_STEP = 2.0
+    MEMORY_HOT = 90.0
+    RATE_CHANGE = 0.5
+    RATE_FLOORS = {'net': 256.0, 'disk': 5.0}
+
+    def __init__(self, sampler=None, alerts=None, minimum=MINIMUM, maximum=MAXIMUM):
+        self.sampler = sampler
+        self.alerts = alerts
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = 1.0
+        self.focused = True
+        self.last = None
+        self.last_time = None
+
+    def busy(self, snapshot):
+        last = self.last or {}
+        cpu = snapshot.get('cpu')
+        if cpu:
+            if cpu.total >= self.CPU_HOT or (cpu.percpu and max(cpu.percpu) >= self.CORE_HOT):
+                return True
+            if last.get('cpu') and abs(cpu.total - last['cpu'].total) >= self.CPU_STEP:
+                return True
+        memory = snapshot.get('memory')
+        if memory:
+            percent = memory.virtual.percent
+            if percent >= self.MEMORY_HOT or (last.get('memory') and abs(percent - last['memory'].virtual.percent) >= self.MEMORY_STEP):
+                return True
+        for key, floor in self.RATE_FLOORS.items():
+            sample = snapshot.get(key)
+            previous = last.get(key)
+            if not (sample and sample.rates and previous and previous.rates):
+                continue
+            for rate, before in zip(sample.rates, previous.rates):
+                if max(rate, before) >= floor and abs(rate - before) > self.RATE_CHANGE * max(rate, before):
+                    return True
+        return bool(self.alerts and self.alerts.active)
+
+    def update(self, snapshot):
+        if snapshot.get('time') != self.last_time:
+            self.last_time = snapshot.get('time')
+            if not self.focused:
+                self.interval = self.maximum
+            elif self.busy(snapshot):
+                self.interval = self.minimum
+            else:
+                self.interval = min(self.interval * self.BACKOFF, self.maximum)
+            self.last = snapshot
+            self.pace()
+        return self.interval
+
+    def focus(self, focused):
+        if focused == self.focused:
+            return
+        self.focused = focused
+        # Coming back into view snaps to the default rate right away instead of waiting out a long idle interval
+        self.interval = 1.0 if focused else self.maximum
+        self.pace()
+
+    def pace(self):
+        set_pace = getattr(self.sampler, 'set_pace', None)
+        if set_pace:
+            set_pace(self.interval)
+
+class Sampler:
+    DEFAULT_INTERVALS = {
+        'cpu': 0.25,
+        'cpu_info': 1.0,
+        'memory': 1.0,
+        'net': 1.0,
+        'disk': 1.0,
+        'nics': 1.0,
+        'disks': 1.0,
+        'processes': 2.0,
+        'process_groups': 2.0,
+        'process_series': 2.0,
+        'temperature': 5.0,
+        'battery': 5.0,
+        'system': 60.0,
+    }
+    
+    BACKENDS = ('auto', 'proc', 'psutil')
+    # Snapshot keys the sampler fills in itself rather than from a collector
+    RESERVED_KEYS = ('time',)
+    # Snapshot keys that only feed alert rules and are left out of exports
+    INTERNAL_KEYS = ('process_series',)
+    PROCESS_VIEWS = ('flat', 'tree', 'user', 'cgroup')
+    # Collectors that report deltas; their first sample only primes counters, so the second follows quickly
+    WARMUP = ('cpu', 'net', 'disk', 'nics', 'disks', 'processes')
+    PRIME_DELAY = 0.25
+
+    def __init__(self, intervals=None, workers=4, process_sort='cpu', top_n=5, backend='auto', profiler=None, process_view='flat',
+                 plugins=(), process_series=False):
+        self.intervals = dict(self.DEFAULT_INTERVALS)
+        self.plugins = plugins
+        for plugin in plugins:
+            self.intervals[plugin.name] = max(plugin.interval, plugin.cost / 1000 / PLUGIN_CPU_SHARE)
+        if intervals:
+            self.intervals.update(intervals)
+        self.collectors = {
+            'cpu': self.collect_cpu,
+            'cpu_info': self.collect_cpu_info,
+            'memory': self.collect_memory,
+            'net': self.collect_net,
+            'disk': self.collect_disk,
+            'nics': self.collect_nics,
+            'disks': self.collect_disks,
+            'processes': self.collect_processes,
+            'process_groups': self.collect_process_groups,
+            'process_series': self.collect_process_series,
+            'temperature': self.collect_temperature,
+            'battery': self.collect_battery,
+            'system': self.collect_system,
+        }
+        for plugin in plugins:
+            if plugin.name in self.collectors or plugin.name in self.RESERVED_KEYS:
+                raise ValueError(f"plugin name {plugin.name!r} clashes with a built-in snapshot key")
+            self.collectors[plugin.name] = plugin.collect
+        self.workers = workers
+        self.snapshot = MappingProxyType({})
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.in_flight = set()
+        self.running = False
+        self.thread = None
+        self.pool = None
+        self.last_net = None
+        self.last_disk = None
+        self.nic_rates = DeviceRates(NicRate, 1024)
+        self.disk_rates = DeviceRates(DiskRate, 1024**2)
+        self.process_table = None
+        self.process_lock = threading.Lock()
+        self.process_view = process_view
+        self.process_toggled = set()
+        self.process_series = process_series
+        self.pace = 1.0
+        self.pace_changed = False
+        self.cpu_primed = False
+        self.cores = psutil.cpu_count() or 1
+        self.process_sort = process_sort
+        self.top_n = top_n
+        self.profiler = profiler
+        self.listeners = []
+        self.proc = None
+        if backend == 'proc' or (backend == 'auto' and ProcReader.available()):
+            self.proc = ProcReader()
+        self.backend = 'proc' if self.proc else 'psutil'
+
+    def start(self):
+        if self.running:
+            return
         self.running = True
-        self.terminal_width = shutil.get_terminal_size().columns
-        self.terminal_height = shutil.get_terminal_size().lines
-        self.last_net_io = psutil.net_io_counters()
-        self.last_disk_io = psutil.disk_io_counters()
-        self.last_time = time.time()
-        self.first_draw = True
-        
-        if platform.system() == 'Windows':
-            os.system('color')
-            os.system('')
-        print(Colors.HIDE_CURSOR, end='')
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='galaxy-sampler')
+        self.thread = threading.Thread(target=self._schedule, name='galaxy-scheduler', daemon=True)
+        self.thread.start()
 
-    def clear_screen_once(self):
-        os.system('cls' if platform.system() == 'Windows' else 'clear')
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        if self.pool:
+            # Collectors still running may be reading through the /proc reader, so let them finish before it is closed
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.proc:
+            self.proc.close()
 
-    def update_at(self, row, col, content):
-        print(f"{move_cursor(row, col)}{content}", end='', flush=True)
+    def interval(self, name):
+        base = self.intervals.get(name, 1.0)
+        if self.pace < 1:
+            # Only the cheap sub-second collectors speed up; process scans and slow sensors keep their interval
+            return max(base * self.pace, AdaptiveRefresh.MINIMUM) if base <= 1 else base
+        return min(base * self.pace, max(base, AdaptiveRefresh.MAXIMUM))
 
-    def clear_at(self, row, col, width):
-        print(f"{move_cursor(row, col)}{' ' * width}", end='', flush=True)
+    def set_pace(self, pace):
+        if pace != self.pace:
+            self.pace = pace
+            self.pace_changed = True
+            self.wakeup.set()
+
+    def _schedule(self):
+        deadlines = {name: time.monotonic() for name in self.collectors}
+        priming = set(self.WARMUP) & set(deadlines)
+        while self.running:
+            now = time.monotonic()
+            if self.pace_changed:
+                self.pace_changed = False
+                for name, deadline in deadlines.items():
+                    deadlines[name] = min(deadline, now + self.interval(name))
+            for name, deadline in deadlines.items():
+                if deadline > now:
+                    continue
+                interval = self.interval(name)
+                if name in priming:
+                    priming.discard(name)
+                    interval = min(interval, self.PRIME_DELAY)
+                deadlines[name] = deadline + interval if deadline + interval > now else now + interval
+                with self.lock:
+                    if name in self.in_flight:
+                        continue
+                    self.in_flight.add(name)
+                self.pool.submit(self._collect, name)
+            self.wakeup.wait(max(min(deadlines.values()) - time.monotonic(), 0.005))
+            self.wakeup.clear()
+
+    def _collect(self, name):
+        start = time.perf_counter_ns()
+        try:
+            value = self.collectors[name]()
+        except:
+            value = None
+        if self.profiler:
+            self.profiler.record(f"collect.{name}", time.perf_counter_ns() - start)
+        with self.lock:
+            data = dict(self.snapshot)
+            data[name] = value
+            data['time'] = time.time()
+            self.snapshot = MappingProxyType(data)
+            self.in_flight.discard(name)
+        for listener in self.listeners:
+            listener(name, value)
+
+    def request(self, name):
+        with self.lock:
+            if not self.running or name in self.in_flight:
+                return
+            self.in_flight.add(name)
+        self.pool.submit(self._collect, name)
+
+    def collect_now(self):
+        for name in self.collectors:
+            self._collect(name)
+        return self.snapshot
+
+    def collect_cpu(self):
+        if self.proc:
+            sample = self.proc.cpu_percent()
+        else:
+            sample = CpuSample(psutil.cpu_percent(interval=None), tuple(psutil.cpu_percent(interval=None, percpu=True)))
+        if not self.cpu_primed:
+            self.cpu_primed = True
+            return None
+        return sample
+
+    def collect_cpu_info(self):
+        return CpuInfo(psutil.cpu_freq(), self.proc.cpu_stats() if self.proc else psutil.cpu_stats())
+
+    def collect_memory(self):
+        if self.proc:
+            return self.proc.memory()
+        return MemorySample(psutil.virtual_memory(), psutil.swap_memory())
+
+    def collect_rates(self, counters, last, fields, scale):
+        now = time.monotonic()
+        rates = None
+        if last and now > last[1]:
+            time_delta = now - last[1]
+            rates = tuple((getattr(counters, f) - getattr(last[0], f)) / time_delta / scale for f in fields)
+        return RateSample(counters, rates), (counters, now)
+
+    def collect_net(self):
+        counters = self.proc.net_io_counters() if self.proc else psutil.net_io_counters()
+        sample, self.last_net = self.collect_rates(counters, self.last_net, ('bytes_sent', 'bytes_recv'), 1024)
+        return sample
+
+    def collect_disk(self):
+        counters = self.proc.disk_io_counters() if self.proc else psutil.disk_io_counters()
+        if not counters:
+            return None
+        sample, self.last_disk = self.collect_rates(counters, self.last_disk, ('read_bytes', 'write_bytes'), 1024**2)
+        return sample
+
+    def collect_nics(self):
+        if self.proc:
+            return self.nic_rates.update(*self.proc.net_io_per_device())
+        counters = psutil.net_io_counters(pernic=True)
+        return self.nic_rates.update(tuple(counters), array('Q', (value for c in counters.values() for value in (c.bytes_sent, c.bytes_recv))))
+
+    def collect_disks(self):
+        if self.proc:
+            return self.disk_rates.update(*self.proc.disk_io_per_device())
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        return self.disk_rates.update(tuple(counters), array('Q', (value for c in counters.values() for value in (c.read_bytes, c.write_bytes))))
+
+    def collect_processes(self):
+        with self.process_lock:
+            primed = self.process_table is not None
+            if not primed:
+                self.process_table = ProcessTable(self.top_n, self.proc)
+            self.process_table.update()
+            return self.process_table.top(self.top_n, self.process_sort) if primed else None
 
-    def get_cpu_temp(self):
+    def collect_process_groups(self):
+        if self.process_view == 'flat' or self.process_table is None:
+            return None
+        with self.process_lock:
+            return self.process_table.group_rows(self.process_view, self.process_sort, self.process_toggled)
+
+    def collect_process_series(self):
+        # Every process rather than the displayed top rows, so per-process alert rules do not depend on the sort order
+        if not self.process_series or self.process_table is None:
+            return None
+        with self.process_lock:
+            return tuple(entry.info() for entry in self.process_table.entries.values())
+
+    def collect_temperature(self):
         try:
             temps = psutil.sensors_temperatures()
             if not temps:
@@ -67,6 +1201,475 @@ class GalaxyManager:
             pass
         return None
 
+    def collect_battery(self):
+        try:
+            return psutil.sensors_battery()
+        except:
+            return None
+
+    def collect_system(self):
+        return SystemInfo(f"{platform.system()} {platform.release()}", psutil.boot_time(),
+                          psutil.cpu_count(logical=False), psutil.cpu_count(logical=True))
+
+PLUGIN_GROUP = 'galaxymanager.plugins'
+# A plugin may declare at most this share of one core; slower declared costs stretch its interval
+PLUGIN_CPU_SHARE = 0.01
+
+class Collector:
+    name = None
+    description = ''
+    interval = 1.0
+    cost = 0.1
+
+    def available(self):
+        return True
+
+    def collect(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class Panel:
+    title = ''
+    rows = 0
+    color = Colors.WHITE
+
+    def render(self, value):
+        return ()
+
+class ProcFilePlugin(Collector):
+    PATHS = ()
+
+    def __init__(self):
+        self.fds = {}
+
+    def available(self):
+        try:
+            for path in self.PATHS:
+                self.read(path)
+        except OSError:
+            self.close()
+            return False
+        return True
+
+    def read(self, path):
+        fd = self.fds.get(path)
+        if fd is None:
+            fd = self.fds[path] = os.open(path, os.O_RDONLY)
+        return os.pread(fd, 4096, 0)
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds.clear()
+
+LoadAvg = namedtuple('LoadAvg', ['load1', 'load5', 'load15', 'running', 'total'])
+Pressure = namedtuple('Pressure', ['resource', 'some10', 'some60', 'full10', 'full60'])
+
+class LoadAvgPlugin(ProcFilePlugin, Panel):
+    PATHS = ('/proc/loadavg',)
+    description = "1/5/15 minute load averages and runnable tasks from /proc/loadavg"
+    interval = 5.0
+    cost = 0.02
+    title = 'LOAD AVERAGE'
+    rows = 2
+    color = Colors.BLUE
+
+    def collect(self):
+        load1, load5, load15, tasks = self.read('/proc/loadavg').split()[:4]
+        running, _, total = tasks.partition(b'/')
+        return LoadAvg(float(load1), float(load5), float(load15), int(running), int(total))
+
+    def render(self, value):
+        cores = os.cpu_count() or 1
+        color = Colors.RED if value.load1 > cores else (Colors.YELLOW if value.load1 > cores * 0.7 else Colors.GREEN)
+        return (f"{Colors.WHITE}Load 1/5/15:{Colors.RESET}    {color}{value.load1:.2f}  {value.load5:.2f}  {value.load15:.2f}{Colors.RESET}",
+                f"{Colors.WHITE}Tasks:{Colors.RESET}          {Colors.CYAN}{value.running} running / {value.total}{Colors.RESET}")
+
+class PressurePlugin(ProcFilePlugin, Panel):
+    RESOURCES = ('cpu', 'memory', 'io')
+    PATHS = tuple(f'/proc/pressure/{resource}' for resource in RESOURCES)
+    description = "pressure stall information (PSI) for CPU, memory and I/O from /proc/pressure"
+    interval = 2.0
+    cost = 0.05
+    title = 'PRESSURE STALL'
+    rows = 4
+    color = Colors.MAGENTA
+
+    def collect(self):
+        samples = []
+        for resource, path in zip(self.RESOURCES, self.PATHS):
+            averages = {}
+            for line in self.read(path).splitlines():
+                kind, *fields = line.split()
+                values = dict(field.split(b'=') for field in fields)
+                averages[kind] = (float(values[b'avg10']), float(values[b'avg60']))
+            some = averages.get(b'some', (0.0, 0.0))
+            full = averages.get(b'full', (0.0, 0.0))
+            samples.append(Pressure(resource, some[0], some[1], full[0], full[1]))
+        return tuple(samples)
+
+    def render(self, value):
+        lines = [f"{Colors.WHITE}{'':<9}{'some 10s':>10}{'60s':>7}{'full 10s':>11}{'60s':>7}{Colors.RESET}"]
+        for sample in value:
+            color = Colors.RED if sample.some10 > 40 else (Colors.YELLOW if sample.some10 > 10 else Colors.GREEN)
+            lines.append(f"{Colors.WHITE}{sample.resource.upper():<9}{Colors.RESET}{color}{sample.some10:>9.1f}%{sample.some60:>6.1f}%"
+                         f"{sample.full10:>10.1f}%{sample.full60:>6.1f}%{Colors.RESET}")
+        return lines
+
+BUILTIN_PLUGINS = {
+    'loadavg': LoadAvgPlugin,
+    'psi': PressurePlugin,
+}
+
+def plugin_entry_points():
+    # importlib.metadata scans every installed distribution, so it is only imported once a non-builtin plugin is asked for
+    from importlib.metadata import entry_points
+    try:
+        found = entry_points(group=PLUGIN_GROUP)
+    except TypeError:
+        found = entry_points().get(PLUGIN_GROUP, ())
+    return {entry.name: entry for entry in found}
+
+def load_plugins(names):
+    plugins = []
+    entries = None
+    for name in dict.fromkeys(names):
+        if name in Sampler.DEFAULT_INTERVALS or name in Sampler.RESERVED_KEYS:
+            raise ValueError(f"plugin name {name!r} clashes with a built-in snapshot key")
+        factory = BUILTIN_PLUGINS.get(name)
+        if factory is None:
+            if entries is None:
+                entries = plugin_entry_points()
+            if name not in entries:
+                raise ValueError(f"unknown plugin {name!r}, available: {', '.join(sorted(set(BUILTIN_PLUGINS) | set(entries)))}")
+            try:
+                factory = entries[name].load()
+            except Exception as e:
+                raise ValueError(f"cannot load plugin {name!r}: {e}")
+        plugin = factory()
+        # Duck-typed: run as a script, this module is __main__ and a plugin's 'from main import Collector' is a second copy
+        if not callable(getattr(plugin, 'collect', None)):
+            raise ValueError(f"plugin {name!r} does not provide a Collector")
+        plugin.name = name
+        if not plugin.available():
+            raise ValueError(f"plugin {name!r} is not available on this system")
+        plugins.append(plugin)
+    return plugins
+
+def list_plugins():
+    rows = [(name, factory.description) for name, factory in BUILTIN_PLUGINS.items()]
+    rows += [(name, f"{entry.value} (not loaded)") for name, entry in sorted(plugin_entry_points().items()) if name not in BUILTIN_PLUGINS]
+    return '\n'.join(f"{name:<12} {description}" for name, description in rows)
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+class RingBuffer:
+    def __init__(self, capacity, typecode='f', width=1, scale=1):
+        self.capacity = capacity
+        self.typecode = typecode
+        self.width = width
+        self.scale = scale
+        self.limit = 2 ** (8 * array(typecode).itemsize) - 1 if typecode in 'BHIL' else None
+        self.data = array(typecode, bytes(array(typecode).itemsize * capacity * width))
+        self.head = 0
+        self.count = 0
+        # Scalar rings keep a running sum; min/max/p95 come from a sorted pass redone after 1% of the ring turns over
+        self.total = 0
+        self.appends = 0
+        self.summary = None
+        self.summarised = 0
+
+    @property
+    def nbytes(self):
+        return self.data.itemsize * len(self.data)
+
+    def encode(self, value):
+        if self.limit is None:
+            return value * self.scale
+        return min(max(int(value * self.scale + 0.5), 0), self.limit)
+
+    def encode_row(self, values):
+        return array(self.typecode, [self.encode(v) for v in values[:self.width]])
+
+    def append(self, value):
+        if isinstance(value, (tuple, list)):
+            self.append_row(self.encode_row(value))
+            return
+        data = self.data
+        i = self.head * self.width
+        if self.count == self.capacity:
+            self.total -= data[i]
+        data[i] = self.encode(value)
+        value = data[i]
+        self.total += value
+        self.appends += 1
+        if self.summary:
+            low, high, p95 = self.summary
+            if value < low or value > high:
+                self.summary = (min(low, value), max(high, value), p95)
+        self.advance()
+
+    def append_row(self, row):
+        start = self.head * self.width
+        self.data[start:start + len(row)] = row
+        self.advance()
+
+    def advance(self):
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def tail(self, n=None, column=0):
+        n = self.count if n is None else min(n, self.count)
+        width = self.width
+        start = (self.head - n) % self.capacity
+        if start + n <= self.capacity:
+            raw = self.data[start * width + column:(start + n) * width:width]
+        else:
+            raw = self.data[start * width + column::width] + self.data[column:self.head * width:width]
+        if self.scale == 1:
+            return raw.tolist()
+        return [v / self.scale for v in raw]
+
+    def last(self, column=0):
+        if not self.count:
+            return None
+        return self.data[((self.head - 1) % self.capacity) * self.width + column] / self.scale
+
+    def stats(self):
+        count = self.count
+        if not count:
+            return None
+        if self.summary is None or self.appends - self.summarised >= max(count // 100, 1):
+            values = sorted(self.data[:count])
+            self.summary = (values[0], values[-1], values[int(0.95 * (count - 1))])
+            self.summarised = self.appends
+        low, high, p95 = self.summary
+        scale = self.scale
+        return low / scale, self.total / count / scale, high / scale, p95 / scale
+
+class History:
+    SOURCES = ('cpu', 'memory', 'net', 'disk')
+    # Per-core rows are kept at this resolution; faster cpu samples are averaged into one slot to bound memory on big hosts
+    PERCPU_SLOT = 1.0
+
+    def __init__(self, seconds=3600, intervals=None, cores=None):
+        # One slot per collector sample, so every ring spans the same time whatever its collector's interval
+        intervals = intervals or {}
+        capacity = {name: max(int(seconds / intervals.get(name, 1.0)), 2) for name in self.SOURCES}
+        self.cores = cores or psutil.cpu_count() or 1
+        self.cpu = RingBuffer(capacity['cpu'], 'B', scale=2)
+        self.fold = max(round(self.PERCPU_SLOT / intervals.get('cpu', 1.0)), 1)
+        self.percpu = RingBuffer(max(capacity['cpu'] // self.fold, 2), 'B', width=self.cores, scale=2)
+        # Latest per-core sample, quantised like percpu, for the live heatmap
+        self.levels = array('B', bytes(self.cores))
+        self.pending = None
+        self.folded = 0
+        self.memory = RingBuffer(capacity['memory'], 'B', scale=2)
+        self.net_up = RingBuffer(capacity['net'], 'f')
+        self.net_down = RingBuffer(capacity['net'], 'f')
+        self.disk_read = RingBuffer(capacity['disk'], 'f')
+        self.disk_write = RingBuffer(capacity['disk'], 'f')
+        self.buffers = (self.cpu, self.percpu, self.memory, self.net_up, self.net_down, self.disk_read, self.disk_write)
+        self.seen = dict.fromkeys(self.SOURCES)
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self.buffers)
+
+    def add(self, name, sample):
+        if name not in self.seen or not sample or sample is self.seen[name]:
+            return
+        self.seen[name] = sample
+        if name == 'cpu':
+            self.cpu.append(sample.total)
+            self.add_percpu(sample.percpu)
+        elif name == 'memory':
+            self.memory.append(sample.virtual.percent)
+        elif name == 'net' and sample.rates:
+            self.net_up.append(sample.rates[0])
+            self.net_down.append(sample.rates[1])
+        elif name == 'disk' and sample.rates:
+            self.disk_read.append(sample.rates[0])
+            self.disk_write.append(sample.rates[1])
+
+    def add_percpu(self, percpu):
+        levels = self.levels = self.percpu.encode_row(percpu)
+        if self.fold == 1:
+            self.percpu.append_row(levels)
+            return
+        self.pending = levels if self.pending is None else array('H', map(add, self.pending, levels))
+        self.folded += 1
+        if self.folded == self.fold:
+            fold = self.fold
+            self.percpu.append_row(array('B', [(total + fold // 2) // fold for total in self.pending]))
+            self.pending = None
+            self.folded = 0
+
+    def record(self, snapshot):
+        for name in self.SOURCES:
+            self.add(name, snapshot.get(name))
+
+HEAT_COLORS = (Colors.GREEN, Colors.YELLOW, Colors.RED)
+HEAT_BUCKETS = bytes(0 if q <= 120 else (1 if q <= 160 else 2) for q in range(256))
+HEAT_LEVELS = bytes(min(q * len(SPARK_CHARS) // 201, len(SPARK_CHARS) - 1) for q in range(256))
+
+def parse_cpulist(text):
+    cpus = []
+    for part in text.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+def cpu_groups(kind):
+    groups = {}
+    try:
+        if kind == 'numa':
+            for path in glob.glob('/sys/devices/system/node/node[0-9]*'):
+                with open(os.path.join(path, 'cpulist')) as f:
+                    groups[int(path.rsplit('node', 1)[1])] = parse_cpulist(f.read())
+        else:
+            for path in glob.glob('/sys/devices/system/cpu/cpu[0-9]*/topology/physical_package_id'):
+                with open(path) as f:
+                    groups.setdefault(int(f.read()), []).append(int(path.split('/')[5][3:]))
+    except:
+        groups = {}
+    if not groups:
+        return [(0, list(range(psutil.cpu_count() or 1)))]
+    return sorted((key, sorted(cpus)) for key, cpus in groups.items() if cpus)
+
+def format_rate(value):
+    if value is None:
+        return '-'
+    for unit in ('B', 'K', 'M', 'G'):
+        if value < 1024 or unit == 'G':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+
+def sparkline(values, width, maximum=None):
+    values = values[-width:]
+    if maximum is None:
+        maximum = max(values, default=0)
+    if maximum <= 0:
+        return SPARK_CHARS[0] * len(values)
+    top = len(SPARK_CHARS) - 1
+    return ''.join(SPARK_CHARS[min(int(v / maximum * top + 0.5), top)] for v in values)
+
+Rect = namedtuple('Rect', ['row', 'col', 'height', 'width'])
+
+PANEL_WIDTH = 48
+MAX_CORE_ROWS = 16
+WARMING_UP = f"{Colors.DIM}warming up{Colors.RESET}"
+
+def compute_layout(width, height, battery=False, panels=()):
+    left = 2
+    # The right column hugs the right edge but never slides under the left one
+    right = max(width - 52, left + PANEL_WIDTH + 2)
+    overview = Rect(9, left, 8 if battery else 7, PANEL_WIDTH)
+    memory = Rect(18, right, 11, PANEL_WIDTH)
+    io_row = max(height - 18, memory.row + memory.height)
+    process_row = max(height - 9, io_row + 9)
+    # Plugin panels only take free space: under MEMORY & SWAP above the I/O panels, then the logo rows in both columns.
+    # Panels that fit nowhere are left out of the layout rather than pushing the process list off-screen
+    extra = {}
+    slots = [[memory.row + memory.height, right, io_row]]
+    logo = True
+    for name, rows in panels:
+        fits = [slot for slot in slots if slot[0] + rows + 2 <= slot[2]]
+        if not fits and logo:
+            logo = False
+            slots += [[1, left, 8], [1, right, 8]]
+            fits = [slot for slot in slots if slot[0] + rows + 2 <= slot[2]]
+        if fits:
+            slot = fits[0]
+            extra[f'plugin.{name}'] = Rect(slot[0], slot[1], rows + 2, PANEL_WIDTH)
+            slot[0] += rows + 2
+    rects = {
+        'logo': Rect(1, max((width - 60) // 2, 1), 7, 60),
+        'banner': Rect(8, left, 1, width - 2),
+        'overview': overview,
+        'cpu_details': Rect(9, right, 9, PANEL_WIDTH),
+        'cores': Rect(18, left, min(MAX_CORE_ROWS + 2, max(io_row - 18, 3)), PANEL_WIDTH),
+        'memory': memory,
+        'network': Rect(io_row, left, 9, PANEL_WIDTH),
+        'disk': Rect(io_row, right, 8, PANEL_WIDTH),
+        'processes': Rect(process_row, max((width - 100) // 2, 1), 8, 90),
+        'profile': Rect(9, max((width - 62) // 2, 1), 23, 62),
+        'footer': Rect(max(height, process_row + 8), max((width - 50) // 2, 1), 1, 50),
+    }
+    if not logo:
+        del rects['logo']
+    rects.update(extra)
+    return rects
+
+class GalaxyManager:
+    CORE_VIEWS = ('auto', 'bars', 'grid', 'numa', 'package')
+    STATIC_CACHE = 8
+    # Sources that never produce rates (e.g. a recording without network data) stop the fast warm-up after this many frames
+    WARMUP_FRAMES = 8
+
+    def __init__(self, sampler=None, refresh=1.0, history_minutes=60, core_view='auto', recorder=None, profiler=None, alerts=None,
+                 pacer=None, plugins=()):
+        self.running = True
+        self.terminal_width = shutil.get_terminal_size().columns
+        self.terminal_height = shutil.get_terminal_size().lines
+        self.sampler = sampler or Sampler()
+        self.refresh = refresh
+        self.history = History(history_minutes * 60, getattr(self.sampler, 'intervals', None), self.sampler.cores)
+        # A live sampler hands every sample to the history as it is collected; replays are recorded frame by frame
+        self.history_listener = hasattr(self.sampler, 'listeners')
+        if self.history_listener:
+            self.sampler.listeners.append(self.history.add)
+        self.recorder = recorder
+        self.last_recorded = None
+        self.core_view = core_view
+        self.device_view = False
+        self.profiler = profiler or Profiler()
+        if getattr(self.sampler, 'profiler', False) is None:
+            self.sampler.profiler = self.profiler
+        self.show_profile = False
+        self.warming = True
+        self.alerts = alerts
+        self.pacer = pacer
+        self.process_cursor = 0
+        self.panels = [
+            ('panel.overview', self.update_overview),
+            ('panel.cpu_details', self.update_cpu_details),
+            ('panel.cores', self.update_core_panel),
+            ('panel.memory', self.update_memory_panel),
+            ('panel.network', self.update_network_panel),
+            ('panel.disk', self.update_disk_panel),
+            ('panel.processes', self.update_process_panel),
+            ('panel.footer', self.update_footer),
+        ]
+        if alerts:
+            self.panels.append(('panel.alerts', self.update_alert_banner))
+        self.plugin_panels = [plugin for plugin in plugins if getattr(plugin, 'rows', 0)]
+        for plugin in self.plugin_panels:
+            self.panels.append((f"panel.{plugin.name}", lambda snap, plugin=plugin: self.update_plugin_panel(plugin, snap)))
+        self.first_draw = True
+        self.layout_note = ''
+        self.screen = ScreenBuffer(self.terminal_width, self.terminal_height)
+        self.profiler.screen = self.screen
+        self.rects = compute_layout(self.terminal_width, self.terminal_height, panels=self.plugin_layout())
+        self.static_cache = {}
+        
+        if platform.system() == 'Windows':
+            os.system('color')
+            os.system('')
+        print(Colors.HIDE_CURSOR, end='')
+
+    def update_at(self, row, col, content):
+        self.screen.put(row, col, content)
+
+    def clear_at(self, row, col, width):
+        self.screen.put(row, col, ' ' * width)
+
     def draw_bar(self, percentage, width=20):
         filled = int(width * percentage / 100)
         bar = "█" * filled + "░" * (width - filled)
@@ -80,8 +1683,43 @@ class GalaxyManager:
         
         return f"[{color}{bar}{Colors.RESET}] {Colors.MAGENTA}{percentage:5.1f}%{Colors.RESET}"
 
+    def draw_history(self, ring, width=14, maximum=None, unit=''):
+        values = ring.tail(width)
+        latest = values[-1] if values else 0
+        if maximum == 100:
+            color = Colors.RED if latest > 80 else (Colors.YELLOW if latest > 60 else Colors.GREEN)
+        else:
+            color = Colors.CYAN
+        line = f"{color}{sparkline(values, width, maximum):<{width}}{Colors.RESET}"
+        stats = ring.stats() if unit else None
+        if stats:
+            line += f" {Colors.DIM}{stats[0]:.0f}/{stats[1]:.0f}/{stats[2]:.0f} p95 {stats[3]:.0f}{unit}{Colors.RESET}"
+        return line
+
+    def plugin_layout(self):
+        return tuple((plugin.name, plugin.rows) for plugin in self.plugin_panels)
+
+    def has_battery(self):
+        try:
+            snap = self.sampler.snapshot
+            return bool(snap['battery'] if 'battery' in snap else psutil.sensors_battery())
+        except:
+            return False
+
     def draw_static_layout(self):
-        center_col = (self.terminal_width - 60) // 2
+        battery = self.has_battery()
+        self.rects = rects = compute_layout(self.terminal_width, self.terminal_height, battery, self.plugin_layout())
+        hidden = [plugin.name for plugin in self.plugin_panels if f'plugin.{plugin.name}' not in rects]
+        self.layout_note = (f"{Colors.YELLOW}No room for plugin panel{'s' if len(hidden) > 1 else ''} {', '.join(hidden)}: "
+                            f"enlarge the terminal{Colors.RESET}") if hidden else ''
+        key = (self.terminal_width, self.terminal_height, battery, self.device_view)
+        cached = self.static_cache.get(key)
+        if cached:
+            self.screen.back = [line[:] for line in cached]
+            # Redrawing the core frame is cheap and restores the grid geometry update_cores relies on
+            self.draw_core_layout(rects['cores'].row, rects['cores'].col, rects['cores'].height - 2)
+            return
+        self.screen.clear()
         
         logo = [
             f"{Colors.CYAN}{Colors.BOLD} _____     _                _____                         {Colors.RESET}",
@@ -91,13 +1729,14 @@ class GalaxyManager:
             f"{Colors.CYAN}{Colors.BOLD}                    |___|                    |___|         {Colors.RESET}"
         ]
         
-        for i, line in enumerate(logo):
-            self.update_at(1 + i, center_col, line)
-        
-        self.update_at(7, (self.terminal_width - 26) // 2, f"{Colors.DIM}Professional Edition v2.0{Colors.RESET}")
+        if 'logo' in rects:
+            for i, line in enumerate(logo):
+                self.update_at(rects['logo'].row + i, rects['logo'].col, line)
+            self.update_at(rects['logo'].row + 6, (self.terminal_width - 26) // 2, f"{Colors.DIM}Professional Edition v2.0{Colors.RESET}")
+        if self.layout_note:
+            self.update_at(rects['banner'].row, rects['banner'].col, self.layout_note)
         
-        col1 = 2
-        row = 9
+        row, col1 = rects['overview'][:2]
         
         self.update_at(row, col1, f"{Colors.CYAN}╔═══ SYSTEM OVERVIEW ═══════════════════════════╗{Colors.RESET}")
         self.update_at(row + 1, col1, f"{Colors.CYAN}║{Colors.RESET} {Colors.WHITE}OS:{Colors.RESET}")
@@ -105,19 +1744,15 @@ class GalaxyManager:
         self.update_at(row + 3, col1, f"{Colors.CYAN}║{Colors.RESET} {Colors.WHITE}CPU Load:{Colors.RESET}")
         self.update_at(row + 4, col1, f"{Colors.CYAN}║{Colors.RESET} {Colors.WHITE}Memory:{Colors.RESET}")
         
-        try:
-            battery = psutil.sensors_battery()
-            if battery:
-                self.update_at(row + 5, col1, f"{Colors.CYAN}║{Colors.RESET} {Colors.WHITE}Battery:{Colors.RESET}")
-                self.update_at(row + 6, col1, f"{Colors.CYAN}╚═══════════════════════════════════════════════╝{Colors.RESET}")
-            else:
-                self.update_at(row + 5, col1, f"{Colors.CYAN}╚═══════════════════════════════════════════════╝{Colors.RESET}")
-        except:
-            self.update_at(row + 5, col1, f"{Colors.CYAN}╚═══════════════════════════════════════════════╝{Colors.RESET}")
+        self.cpu_history_row = row + 5
+        if battery:
+            self.update_at(row + 5, col1, f"{Colors.CYAN}║{Colors.RESET} {Colors.WHITE}Battery:{Colors.RESET}")
+            self.cpu_history_row = row + 6
         
-        col2 = self.terminal_width - 52
-        row = 9
+        self.update_at(self.cpu_history_row, col1, f"{Colors.CYAN}║{Colors.RESET} {Colors.WHITE}CPU Hist:{Colors.RESET}")
+        self.update_at(self.cpu_history_row + 1, col1, f"{Colors.CYAN}╚═══════════════════════════════════════════════╝{Colors.RESET}")
         
+        row, col2 = rects['cpu_details'][:2]
         self.update_at(row, col2, f"{Colors.BLUE}╔═══ CPU DETAILS ═══════════════════════════════╗{Colors.RESET}")
         self.update_at(row + 1, col2, f"{Colors.BLUE}║{Colors.RESET} {Colors.WHITE}Physical Cores:{Colors.RESET}")
         self.update_at(row + 2, col2, f"{Colors.BLUE}║{Colors.RESET} {Colors.WHITE}Logical Cores:{Colors.RESET}")
@@ -128,19 +1763,9 @@ class GalaxyManager:
         self.update_at(row + 7, col2, f"{Colors.BLUE}║{Colors.RESET} {Colors.WHITE}Temperature:{Colors.RESET}")
         self.update_at(row + 8, col2, f"{Colors.BLUE}╚═══════════════════════════════════════════════╝{Colors.RESET}")
         
-        start_row = 18
-        col = 2
-        
-        self.update_at(start_row, col, f"{Colors.MAGENTA}╔═══ CPU CORES ═════════════════════════════════╗{Colors.RESET}")
-        
-        cpu_count = psutil.cpu_count()
-        for i in range(min(cpu_count, 16)):
-            self.update_at(start_row + 1 + i, col, f"{Colors.MAGENTA}║{Colors.RESET} {Colors.WHITE}Core {i:2d}:{Colors.RESET}")
+        self.draw_core_layout(rects['cores'].row, rects['cores'].col, rects['cores'].height - 2)
         
-        self.update_at(start_row + 1 + min(cpu_count, 16), col, f"{Colors.MAGENTA}╚═══════════════════════════════════════════════╝{Colors.RESET}")
-        
-        col = self.terminal_width - 52
-        row = 18
+        row, col = rects['memory'][:2]
         
         self.update_at(row, col, f"{Colors.GREEN}╔═══ MEMORY & SWAP ═════════════════════════════╗{Colors.RESET}")
         self.update_at(row + 1, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}RAM Total:{Colors.RESET}")
@@ -149,101 +1774,300 @@ class GalaxyManager:
         self.update_at(row + 4, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}Available:{Colors.RESET}")
         self.update_at(row + 5, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}Cached:{Colors.RESET}")
         self.update_at(row + 6, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}Buffers:{Colors.RESET}")
-        self.update_at(row + 7, col, f"{Colors.GREEN}║{Colors.RESET}")
+        self.update_at(row + 7, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}Mem Hist:{Colors.RESET}")
         self.update_at(row + 8, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}SWAP Total:{Colors.RESET}")
         self.update_at(row + 9, col, f"{Colors.GREEN}║{Colors.RESET} {Colors.WHITE}SWAP Used:{Colors.RESET}")
         self.update_at(row + 10, col, f"{Colors.GREEN}╚═══════════════════════════════════════════════╝{Colors.RESET}")
         
-        row = self.terminal_height - 18
-        col = 2
-        
-        self.update_at(row, col, f"{Colors.YELLOW}╔═══ NETWORK I/O ═══════════════════════════════╗{Colors.RESET}")
-        self.update_at(row + 1, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}↑ Upload:{Colors.RESET}")
-        self.update_at(row + 2, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}↓ Download:{Colors.RESET}")
-        self.update_at(row + 3, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Total Sent:{Colors.RESET}")
-        self.update_at(row + 4, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Total Recv:{Colors.RESET}")
-        self.update_at(row + 5, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Packets Sent:{Colors.RESET}")
-        self.update_at(row + 6, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Packets Recv:{Colors.RESET}")
-        self.update_at(row + 7, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Errors:{Colors.RESET}")
-        self.update_at(row + 8, col, f"{Colors.YELLOW}╚═══════════════════════════════════════════════╝{Colors.RESET}")
-        
-        row = self.terminal_height - 18
-        col = self.terminal_width - 52
+        for plugin in self.plugin_panels:
+            if f'plugin.{plugin.name}' not in rects:
+                continue
+            row, col, height, _ = rects[f'plugin.{plugin.name}']
+            color = plugin.color
+            self.update_at(row, col, f"{color}╔═══ {plugin.title} {'═' * (42 - len(plugin.title))}╗{Colors.RESET}")
+            for i in range(1, height - 1):
+                self.update_at(row + i, col, f"{color}║{Colors.RESET}")
+            self.update_at(row + height - 1, col, f"{color}╚{'═' * 47}╝{Colors.RESET}")
         
-        self.update_at(row, col, f"{Colors.RED}╔═══ DISK I/O ══════════════════════════════════╗{Colors.RESET}")
-        self.update_at(row + 1, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}📖 Read Speed:{Colors.RESET}")
-        self.update_at(row + 2, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}📝 Write Speed:{Colors.RESET}")
-        self.update_at(row + 3, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Total Read:{Colors.RESET}")
-        self.update_at(row + 4, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Total Write:{Colors.RESET}")
-        self.update_at(row + 5, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Read Ops:{Colors.RESET}")
-        self.update_at(row + 6, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Write Ops:{Colors.RESET}")
-        self.update_at(row + 7, col, f"{Colors.RED}╚═══════════════════════════════════════════════╝{Colors.RESET}")
+        self.draw_io_layout()
         
-        center_col = (self.terminal_width - 100) // 2
-        row = self.terminal_height - 9
+        row, center_col = rects['processes'][:2]
         
         self.update_at(row, center_col, f"{Colors.CYAN}{Colors.BOLD}╔═══ TOP PROCESSES ═══════════════════════════════════════════════════════════════════════╗{Colors.RESET}")
         header = f"║ {Colors.BOLD}{'PID':<8} {'NAME':<32} {'CPU%':<8} {'MEM%':<8} {'THREADS':<9} {'STATUS':<10}{Colors.RESET} ║"
         self.update_at(row + 1, center_col, header)
         self.update_at(row + 7, center_col, f"{Colors.CYAN}╚═════════════════════════════════════════════════════════════════════════════════════════╝{Colors.RESET}")
+        if len(self.static_cache) >= self.STATIC_CACHE:
+            self.static_cache.pop(next(iter(self.static_cache)))
+        self.static_cache[key] = [line[:] for line in self.screen.back]
 
-    def update_dynamic_data(self):
-        col1 = 2
-        row = 9
-        
-        uptime = datetime.now() - datetime.fromtimestamp(psutil.boot_time())
-        uptime_str = str(uptime).split('.')[0]
+    def resize(self, width=None, height=None):
+        if width is None:
+            width, height = shutil.get_terminal_size()
+        if (width, height) == (self.terminal_width, self.terminal_height):
+            return
+        self.terminal_width = width
+        self.terminal_height = height
+        self.screen.resize(width, height)
+        self.draw_static_layout()
+
+    def draw_io_layout(self):
+        row, col = self.rects['network'][:2]
         
-        self.clear_at(row + 1, col1 + 15, 35)
-        self.update_at(row + 1, col1 + 15, f"{Colors.GREEN}{platform.system()} {platform.release()}{Colors.RESET}")
+        self.update_at(row, col, f"{Colors.YELLOW}╔═══ NETWORK I/O ═══════════════════════════════╗{Colors.RESET}")
+        for i in range(1, 8):
+            self.clear_at(row + i, col, 49)
+        if self.device_view:
+            self.update_at(row + 1, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}{'Interface':<14} {'↑ KB/s':>10}  {'↓ KB/s':>10}{Colors.RESET}")
+            for i in range(2, 8):
+                self.update_at(row + i, col, f"{Colors.YELLOW}║{Colors.RESET}")
+        else:
+            self.update_at(row + 1, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}↑ Upload:{Colors.RESET}")
+            self.update_at(row + 2, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}↓ Download:{Colors.RESET}")
+            self.update_at(row + 3, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Total Sent:{Colors.RESET}")
+            self.update_at(row + 4, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Total Recv:{Colors.RESET}")
+            self.update_at(row + 5, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Packets Sent:{Colors.RESET}")
+            self.update_at(row + 6, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Packets Recv:{Colors.RESET}")
+            self.update_at(row + 7, col, f"{Colors.YELLOW}║{Colors.RESET} {Colors.WHITE}Errors:{Colors.RESET}")
+        self.update_at(row + 8, col, f"{Colors.YELLOW}╚═══════════════════════════════════════════════╝{Colors.RESET}")
         
-        self.clear_at(row + 2, col1 + 15, 35)
-        self.update_at(row + 2, col1 + 15, f"{Colors.GREEN}{uptime_str}{Colors.RESET}")
+        row, col = self.rects['disk'][:2]
         
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        self.clear_at(row + 3, col1 + 15, 35)
-        self.update_at(row + 3, col1 + 15, self.draw_bar(cpu_percent, 20))
+        self.update_at(row, col, f"{Colors.RED}╔═══ DISK I/O ══════════════════════════════════╗{Colors.RESET}")
+        for i in range(1, 7):
+            self.clear_at(row + i, col, 49)
+        if self.device_view:
+            self.update_at(row + 1, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}{'Device':<14} {'Read MB/s':>10}  {'Write MB/s':>10}{Colors.RESET}")
+            for i in range(2, 7):
+                self.update_at(row + i, col, f"{Colors.RED}║{Colors.RESET}")
+        else:
+            self.update_at(row + 1, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}📖 Read Speed:{Colors.RESET}")
+            self.update_at(row + 2, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}📝 Write Speed:{Colors.RESET}")
+            self.update_at(row + 3, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Total Read:{Colors.RESET}")
+            self.update_at(row + 4, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Total Write:{Colors.RESET}")
+            self.update_at(row + 5, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Read Ops:{Colors.RESET}")
+            self.update_at(row + 6, col, f"{Colors.RED}║{Colors.RESET} {Colors.WHITE}Write Ops:{Colors.RESET}")
+        self.update_at(row + 7, col, f"{Colors.RED}╚═══════════════════════════════════════════════╝{Colors.RESET}")
+
+    def update_devices(self, devices, row, col, count, metric):
+        for i in range(count):
+            self.clear_at(row + i, col + 2, 47)
+        if devices is None:
+            self.update_at(row, col + 2, WARMING_UP)
+        elif not devices:
+            self.update_at(row, col + 2, f"{Colors.DIM}no active devices{Colors.RESET}")
+        for i, (name, first, second) in enumerate(devices[:count] if devices else ()):
+            color = Colors.GREEN if first or second else Colors.DIM
+            label = Colors.CYAN
+            if self.alerts and any(self.alerts.firing(f"{metric}.{field}", name) for field in devices[0]._fields[1:]):
+                label = f"{Colors.RED}{Colors.REVERSE}"
+            self.update_at(row + i, col + 2, f"{label}{name[:14]:<14}{Colors.RESET} {color}{first:>10.2f}  {second:>10.2f}{Colors.RESET}")
+
+    def draw_profile_overlay(self, max_rows=19):
+        row, col, _, width = self.rects['profile']
+        usage = self.profiler.usage()
+        timings = sorted(self.profiler.summary().items(), key=lambda item: -item[1]['ms_per_s'])[:max_rows]
+        
+        lines = [f"{Colors.BOLD}{'TIMER':<20} {'CALLS':>7} {'MEAN µs':>9} {'P99 µs':>9} {'ms/s':>8}{Colors.RESET}"]
+        for name, stats in timings:
+            lines.append(f"{Colors.CYAN}{name[:20]:<20}{Colors.RESET} {stats['count']:>7} {stats['mean_us']:>9.1f} "
+                         f"{stats['p99_us']:>9.1f} {Colors.YELLOW}{stats['ms_per_s']:>8.3f}{Colors.RESET}")
+        color = Colors.RED if self.profiler.over_budget(usage) else Colors.GREEN
+        budget = f" / {self.profiler.budget:g}%" if self.profiler.budget is not None else ""
+        lines.append(f"{Colors.WHITE}Self:{Colors.RESET} {color}CPU {usage['cpu_percent']:.2f}% avg {usage['avg_cpu_percent']:.2f}%{budget}{Colors.RESET}"
+                     f"  {Colors.WHITE}RSS{Colors.RESET} {usage['rss_bytes'] / 1024**2:.1f} MB")
+        output = self.profiler.output()
+        if output:
+            lines.append(f"{Colors.WHITE}Output:{Colors.RESET} {output['bytes_per_frame']} B/frame, naive {output['naive_bytes_per_frame']} B/frame "
+                         f"{Colors.GREEN}({output['saved_percent']:.0f}% saved){Colors.RESET}")
+        
+        self.update_at(row, col, f"{Colors.MAGENTA}╔═══ PROFILE {'═' * (width - 14)}╗{Colors.RESET}")
+        for i, line in enumerate(lines):
+            self.clear_at(row + 1 + i, col, width)
+            self.update_at(row + 1 + i, col, f"{Colors.MAGENTA}║{Colors.RESET} {line}")
+            self.update_at(row + 1 + i, col + width - 1, f"{Colors.MAGENTA}║{Colors.RESET}")
+        self.update_at(row + 1 + len(lines), col, f"{Colors.MAGENTA}╚{'═' * (width - 2)}╝{Colors.RESET}")
+
+    def draw_core_layout(self, start_row, col, max_rows=16):
+        cores = self.history.cores
+        view = self.core_view
+        if view == 'auto':
+            view = 'bars' if cores <= max_rows else 'grid'
+        
+        if view in ('numa', 'package'):
+            self.core_groups = cpu_groups(view)[:max_rows]
+            prefix = 'Node' if view == 'numa' else 'Pkg'
+            labels = [f"{Colors.WHITE}{prefix} {key:2d}:{Colors.RESET}" for key, _ in self.core_groups]
+        elif view == 'grid':
+            for width in (4, 2, 1):
+                per_row = 40 // width
+                if -(-cores // per_row) <= max_rows:
+                    break
+            self.core_cell_width = width
+            self.core_per_row = per_row
+            labels = [f"{Colors.DIM}{start:>3}{Colors.RESET}" for start in range(0, cores, per_row)][:max_rows]
+        else:
+            labels = [f"{Colors.WHITE}Core {i:2d}:{Colors.RESET}" for i in range(min(cores, max_rows))]
         
-        mem = psutil.virtual_memory()
-        self.clear_at(row + 4, col1 + 15, 35)
-        self.update_at(row + 4, col1 + 15, self.draw_bar(mem.percent, 20))
+        self.core_mode = view
+        self.core_rows = len(labels)
+        self.update_at(start_row, col, f"{Colors.MAGENTA}╔═══ CPU CORES ═════════════════════════════════╗{Colors.RESET}")
+        for i, label in enumerate(labels):
+            self.update_at(start_row + 1 + i, col, f"{Colors.MAGENTA}║{Colors.RESET} {label}")
+        self.update_at(start_row + 1 + self.core_rows, col, f"{Colors.MAGENTA}╚═══════════════════════════════════════════════╝{Colors.RESET}")
+
+    def update_cores(self, cpu, start_row, col):
+        if self.core_mode == 'bars':
+            for i, percent in enumerate(cpu.percpu[:self.core_rows]):
+                self.highlight(start_row + 1 + i, col + 2, f"Core {i:2d}:", 'cpu.core', i)
+                self.clear_at(start_row + 1 + i, col + 15, 35)
+                self.update_at(start_row + 1 + i, col + 15, self.draw_bar(percent, 20))
+        elif self.core_mode == 'grid':
+            levels = self.history.levels.tobytes()
+            buckets = levels.translate(HEAT_BUCKETS)
+            glyphs = levels.translate(HEAT_LEVELS)
+            width = self.core_cell_width
+            per_row = self.core_per_row
+            for r in range(self.core_rows):
+                parts = []
+                color = None
+                for i in range(r * per_row, min((r + 1) * per_row, len(levels))):
+                    if buckets[i] != color:
+                        color = buckets[i]
+                        parts.append(HEAT_COLORS[color])
+                    if width == 4:
+                        parts.append(f"{levels[i] / 2:3.0f} ")
+                    elif width == 2:
+                        parts.append(SPARK_CHARS[glyphs[i]] + ' ')
+                    else:
+                        parts.append(SPARK_CHARS[glyphs[i]])
+                parts.append(Colors.RESET)
+                self.clear_at(start_row + 1 + r, col + 6, 41)
+                self.update_at(start_row + 1 + r, col + 6, ''.join(parts))
+        else:
+            percpu = cpu.percpu
+            for i, (_, cpus) in enumerate(self.core_groups):
+                values = [percpu[c] for c in cpus if c < len(percpu)]
+                self.clear_at(start_row + 1 + i, col + 15, 35)
+                self.update_at(start_row + 1 + i, col + 15, self.draw_bar(sum(values) / len(values) if values else 0, 20))
+
+    def update_dynamic_data(self, snapshot=None):
+        snap = snapshot if snapshot is not None else self.sampler.snapshot
+        if snap.get('time') != self.last_recorded:
+            self.last_recorded = snap.get('time')
+            if not self.history_listener:
+                self.history.record(snap)
+            if self.recorder:
+                self.recorder.append(snap)
+            if self.alerts:
+                self.profiler.timed('alerts.evaluate', self.alerts.evaluate, snap)
+        
+        timed = self.profiler.timed
+        for label, panel in self.panels:
+            timed(label, panel, snap)
+        if self.show_profile:
+            timed('panel.profile', self.draw_profile_overlay)
+        data = timed('render.diff', self.screen.render)
+        timed('render.write', self.screen.write, data)
+        if self.warming:
+            if snap.get('cpu') and snap.get('net') and snap['net'].rates:
+                self.warming = False
+                self.profiler.mark('first_data')
+            elif self.screen.frames >= self.WARMUP_FRAMES:
+                self.warming = False
+
+    def highlight(self, row, col, label, metric, key=None):
+        if not self.alerts:
+            return
+        style = f"{Colors.RED}{Colors.REVERSE}" if self.alerts.firing(metric, key) else Colors.WHITE
+        self.update_at(row, col, f"{style}{label}{Colors.RESET}")
+
+    def update_alert_banner(self, snap):
+        active = list(self.alerts.active.values())
+        row, col, _, width = self.rects['banner']
+        self.clear_at(row, col, width)
+        if not active:
+            if self.layout_note:
+                self.update_at(row, col, self.layout_note)
+            return
+        parts = []
+        for alert in active:
+            series = alert.metric if alert.key is None else f"{alert.metric}[{alert.key}]"
+            value = f"={alert.value:.1f}" if isinstance(alert.value, (int, float)) else ''
+            parts.append(f"{alert.rule} {series}{value}")
+        text = f"⚠ {len(active)} ALERT{'S' if len(active) > 1 else ''}: " + '  '.join(parts)
+        self.update_at(row, col, f"{Colors.RED}{Colors.BOLD}{text[:width - 2]}{Colors.RESET}")
+
+    def update_overview(self, snap):
+        row, col1 = self.rects['overview'][:2]
         
-        try:
-            battery = psutil.sensors_battery()
-            if battery:
-                bat_status = "⚡" if battery.power_plugged else "🔋"
-                self.clear_at(row + 5, col1 + 15, 35)
-                self.update_at(row + 5, col1 + 15, f"{bat_status} {self.draw_bar(battery.percent, 18)}")
-        except:
-            pass
+        system = snap.get('system')
+        if system:
+            uptime = datetime.fromtimestamp(snap.get('time') or time.time()) - datetime.fromtimestamp(system.boot_time)
+            uptime_str = str(uptime).split('.')[0]
+            
+            self.clear_at(row + 1, col1 + 15, 35)
+            self.update_at(row + 1, col1 + 15, f"{Colors.GREEN}{system.os}{Colors.RESET}")
+            
+            self.clear_at(row + 2, col1 + 15, 35)
+            self.update_at(row + 2, col1 + 15, f"{Colors.GREEN}{uptime_str}{Colors.RESET}")
+        
+        cpu = snap.get('cpu')
+        if cpu:
+            self.highlight(row + 3, col1 + 2, "CPU Load:", 'cpu')
+            self.clear_at(row + 3, col1 + 15, 35)
+            self.update_at(row + 3, col1 + 15, self.draw_bar(cpu.total, 20))
+            
+            self.clear_at(self.cpu_history_row, col1 + 15, 33)
+            self.update_at(self.cpu_history_row, col1 + 15, self.draw_history(self.history.cpu, 14, 100, '%'))
+        else:
+            self.clear_at(row + 3, col1 + 15, 35)
+            self.update_at(row + 3, col1 + 15, WARMING_UP)
+        
+        memory = snap.get('memory')
+        if memory:
+            self.highlight(row + 4, col1 + 2, "Memory:", 'memory')
+            self.clear_at(row + 4, col1 + 15, 35)
+            self.update_at(row + 4, col1 + 15, self.draw_bar(memory.virtual.percent, 20))
+        
+        battery = snap.get('battery')
+        if battery:
+            bat_status = "⚡" if battery.power_plugged else "🔋"
+            self.highlight(row + 5, col1 + 2, "Battery:", 'battery')
+            self.clear_at(row + 5, col1 + 15, 35)
+            self.update_at(row + 5, col1 + 15, f"{bat_status} {self.draw_bar(battery.percent, 18)}")
+
+    def update_cpu_details(self, snap):
+        row, col2 = self.rects['cpu_details'][:2]
         
-        col2 = self.terminal_width - 52
-        row = 9
+        system = snap.get('system')
+        if system:
+            self.clear_at(row + 1, col2 + 25, 25)
+            self.update_at(row + 1, col2 + 25, f"{Colors.GREEN}{system.physical_cores}{Colors.RESET}")
+            
+            self.clear_at(row + 2, col2 + 25, 25)
+            self.update_at(row + 2, col2 + 25, f"{Colors.GREEN}{system.logical_cores}{Colors.RESET}")
         
-        cpu_count_physical = psutil.cpu_count(logical=False)
-        cpu_count_logical = psutil.cpu_count(logical=True)
-        cpu_freq = psutil.cpu_freq()
-        cpu_stats = psutil.cpu_stats()
-        
-        self.clear_at(row + 1, col2 + 25, 25)
-        self.update_at(row + 1, col2 + 25, f"{Colors.GREEN}{cpu_count_physical}{Colors.RESET}")
-        
-        self.clear_at(row + 2, col2 + 25, 25)
-        self.update_at(row + 2, col2 + 25, f"{Colors.GREEN}{cpu_count_logical}{Colors.RESET}")
-        
-        self.clear_at(row + 3, col2 + 25, 25)
-        self.update_at(row + 3, col2 + 25, f"{Colors.GREEN}{cpu_freq.current:.0f} MHz{Colors.RESET}")
-        
-        self.clear_at(row + 4, col2 + 25, 25)
-        self.update_at(row + 4, col2 + 25, f"{Colors.GREEN}{cpu_freq.max:.0f} MHz{Colors.RESET}")
-        
-        self.clear_at(row + 5, col2 + 25, 25)
-        self.update_at(row + 5, col2 + 25, f"{Colors.YELLOW}{cpu_stats.ctx_switches:,}{Colors.RESET}")
-        
-        self.clear_at(row + 6, col2 + 25, 25)
-        self.update_at(row + 6, col2 + 25, f"{Colors.YELLOW}{cpu_stats.interrupts:,}{Colors.RESET}")
+        cpu_info = snap.get('cpu_info')
+        if cpu_info:
+            cpu_freq = cpu_info.freq
+            cpu_stats = cpu_info.stats
+            
+            if cpu_freq:
+                self.clear_at(row + 3, col2 + 25, 25)
+                self.update_at(row + 3, col2 + 25, f"{Colors.GREEN}{cpu_freq.current:.0f} MHz{Colors.RESET}")
+                
+                self.clear_at(row + 4, col2 + 25, 25)
+                self.update_at(row + 4, col2 + 25, f"{Colors.GREEN}{cpu_freq.max:.0f} MHz{Colors.RESET}")
+            
+            self.clear_at(row + 5, col2 + 25, 25)
+            self.update_at(row + 5, col2 + 25, f"{Colors.YELLOW}{cpu_stats.ctx_switches:,}{Colors.RESET}")
+            
+            self.clear_at(row + 6, col2 + 25, 25)
+            self.update_at(row + 6, col2 + 25, f"{Colors.YELLOW}{cpu_stats.interrupts:,}{Colors.RESET}")
         
-        temp = self.get_cpu_temp()
+        temp = snap.get('temperature')
+        self.highlight(row + 7, col2 + 2, "Temperature:", 'temperature')
         if temp:
             temp_color = Colors.GREEN if temp < 60 else (Colors.YELLOW if temp < 80 else Colors.RED)
             self.clear_at(row + 7, col2 + 25, 25)
@@ -251,106 +2075,122 @@ class GalaxyManager:
         else:
             self.clear_at(row + 7, col2 + 25, 25)
             self.update_at(row + 7, col2 + 25, f"{Colors.YELLOW}N/A{Colors.RESET}")
-        
-        start_row = 18
-        col = 2
-        
-        cpu_percents = psutil.cpu_percent(interval=0, percpu=True)
-        for i, percent in enumerate(cpu_percents[:16]):
-            self.clear_at(start_row + 1 + i, col + 15, 35)
-            self.update_at(start_row + 1 + i, col + 15, self.draw_bar(percent, 20))
-        
-        col = self.terminal_width - 52
-        row = 18
-        
-        mem = psutil.virtual_memory()
-        swap = psutil.swap_memory()
-        
-        self.clear_at(row + 1, col + 20, 30)
-        self.update_at(row + 1, col + 20, f"{Colors.CYAN}{mem.total / (1024**3):.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 2, col + 20, 30)
-        self.update_at(row + 2, col + 20, f"{Colors.YELLOW}{mem.used / (1024**3):.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 3, col + 20, 30)
-        self.update_at(row + 3, col + 20, f"{Colors.GREEN}{mem.free / (1024**3):.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 4, col + 20, 30)
-        self.update_at(row + 4, col + 20, f"{Colors.GREEN}{mem.available / (1024**3):.2f} GB{Colors.RESET}")
-        
-        cached = mem.cached / (1024**3) if hasattr(mem, 'cached') else 0
-        buffers = mem.buffers / (1024**3) if hasattr(mem, 'buffers') else 0
-        
-        self.clear_at(row + 5, col + 20, 30)
-        self.update_at(row + 5, col + 20, f"{Colors.BLUE}{cached:.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 6, col + 20, 30)
-        self.update_at(row + 6, col + 20, f"{Colors.BLUE}{buffers:.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 8, col + 20, 30)
-        self.update_at(row + 8, col + 20, f"{Colors.CYAN}{swap.total / (1024**3):.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 9, col + 20, 30)
-        self.update_at(row + 9, col + 20, f"{Colors.YELLOW}{swap.used / (1024**3):.2f} GB{Colors.RESET}")
-        
-        row = self.terminal_height - 18
-        col = 2
-        
-        current_net_io = psutil.net_io_counters()
-        current_time = time.time()
-        time_delta = current_time - self.last_time
-        
-        if time_delta > 0:
-            upload_speed = (current_net_io.bytes_sent - self.last_net_io.bytes_sent) / time_delta / 1024
-            download_speed = (current_net_io.bytes_recv - self.last_net_io.bytes_recv) / time_delta / 1024
+
+    def update_core_panel(self, snap):
+        cpu = snap.get('cpu')
+        row, col = self.rects['cores'][:2]
+        if cpu:
+            self.update_cores(cpu, row, col)
         else:
-            upload_speed = 0
-            download_speed = 0
-        
-        self.last_net_io = current_net_io
-        self.last_time = current_time
-        
-        self.clear_at(row + 1, col + 20, 30)
-        self.update_at(row + 1, col + 20, f"{Colors.GREEN}{upload_speed:.2f} KB/s{Colors.RESET}")
-        
-        self.clear_at(row + 2, col + 20, 30)
-        self.update_at(row + 2, col + 20, f"{Colors.GREEN}{download_speed:.2f} KB/s{Colors.RESET}")
-        
-        self.clear_at(row + 3, col + 20, 30)
-        self.update_at(row + 3, col + 20, f"{Colors.CYAN}{current_net_io.bytes_sent / (1024**3):.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 4, col + 20, 30)
-        self.update_at(row + 4, col + 20, f"{Colors.CYAN}{current_net_io.bytes_recv / (1024**3):.2f} GB{Colors.RESET}")
-        
-        self.clear_at(row + 5, col + 20, 30)
-        self.update_at(row + 5, col + 20, f"{Colors.MAGENTA}{current_net_io.packets_sent:,}{Colors.RESET}")
-        
-        self.clear_at(row + 6, col + 20, 30)
-        self.update_at(row + 6, col + 20, f"{Colors.MAGENTA}{current_net_io.packets_recv:,}{Colors.RESET}")
-        
-        self.clear_at(row + 7, col + 20, 30)
-        self.update_at(row + 7, col + 20, f"{Colors.RED}In:{current_net_io.errin} Out:{current_net_io.errout}{Colors.RESET}")
-        
-        row = self.terminal_height - 18
-        col = self.terminal_width - 52
+            self.clear_at(row + 1, col + 15, 35)
+            self.update_at(row + 1, col + 15, WARMING_UP)
+
+    def update_memory_panel(self, snap):
+        row, col = self.rects['memory'][:2]
         
-        try:
-            current_disk_io = psutil.disk_io_counters()
+        memory = snap.get('memory')
+        if memory:
+            mem = memory.virtual
+            swap = memory.swap
             
-            if time_delta > 0 and self.last_disk_io:
-                read_speed = (current_disk_io.read_bytes - self.last_disk_io.read_bytes) / time_delta / (1024**2)
-                write_speed = (current_disk_io.write_bytes - self.last_disk_io.write_bytes) / time_delta / (1024**2)
-            else:
-                read_speed = 0
-                write_speed = 0
+            self.clear_at(row + 1, col + 20, 30)
+            self.update_at(row + 1, col + 20, f"{Colors.CYAN}{mem.total / (1024**3):.2f} GB{Colors.RESET}")
+            
+            self.clear_at(row + 2, col + 20, 30)
+            self.update_at(row + 2, col + 20, f"{Colors.YELLOW}{mem.used / (1024**3):.2f} GB{Colors.RESET}")
+            
+            self.clear_at(row + 3, col + 20, 30)
+            self.update_at(row + 3, col + 20, f"{Colors.GREEN}{mem.free / (1024**3):.2f} GB{Colors.RESET}")
+            
+            self.clear_at(row + 4, col + 20, 30)
+            self.update_at(row + 4, col + 20, f"{Colors.GREEN}{mem.available / (1024**3):.2f} GB{Colors.RESET}")
+            
+            cached = mem.cached / (1024**3) if hasattr(mem, 'cached') else 0
+            buffers = mem.buffers / (1024**3) if hasattr(mem, 'buffers') else 0
+            
+            self.clear_at(row + 5, col + 20, 30)
+            self.update_at(row + 5, col + 20, f"{Colors.BLUE}{cached:.2f} GB{Colors.RESET}")
+            
+            self.clear_at(row + 6, col + 20, 30)
+            self.update_at(row + 6, col + 20, f"{Colors.BLUE}{buffers:.2f} GB{Colors.RESET}")
+            
+            self.clear_at(row + 7, col + 15, 33)
+            self.update_at(row + 7, col + 15, self.draw_history(self.history.memory, 14, 100, '%'))
+            
+            self.clear_at(row + 8, col + 20, 30)
+            self.update_at(row + 8, col + 20, f"{Colors.CYAN}{swap.total / (1024**3):.2f} GB{Colors.RESET}")
+            
+            self.highlight(row + 9, col + 2, "SWAP Used:", 'swap')
+            self.clear_at(row + 9, col + 20, 30)
+            self.update_at(row + 9, col + 20, f"{Colors.YELLOW}{swap.used / (1024**3):.2f} GB{Colors.RESET}")
+
+    def update_network_panel(self, snap):
+        row, col = self.rects['network'][:2]
+        
+        net = snap.get('net')
+        if self.device_view:
+            self.update_devices(snap.get('nics'), row + 2, col, 6, 'nics')
+            return
+        if net and net.rates:
+            upload_speed, download_speed = net.rates
+            self.highlight(row + 1, col + 2, "↑ Upload:", 'net.up')
+            self.highlight(row + 2, col + 2, "↓ Download:", 'net.down')
+            
+            self.clear_at(row + 1, col + 20, 30)
+            self.update_at(row + 1, col + 20, f"{Colors.GREEN}{upload_speed:.2f} KB/s{Colors.RESET}")
+            self.update_at(row + 1, col + 35, self.draw_history(self.history.net_up, 12))
+            
+            self.clear_at(row + 2, col + 20, 30)
+            self.update_at(row + 2, col + 20, f"{Colors.GREEN}{download_speed:.2f} KB/s{Colors.RESET}")
+            self.update_at(row + 2, col + 35, self.draw_history(self.history.net_down, 12))
+        else:
+            for i in (1, 2):
+                self.clear_at(row + i, col + 20, 30)
+                self.update_at(row + i, col + 20, WARMING_UP)
+        if net:
+            current_net_io = net.counters
+            
+            self.clear_at(row + 3, col + 20, 30)
+            self.update_at(row + 3, col + 20, f"{Colors.CYAN}{current_net_io.bytes_sent / (1024**3):.2f} GB{Colors.RESET}")
+            
+            self.clear_at(row + 4, col + 20, 30)
+            self.update_at(row + 4, col + 20, f"{Colors.CYAN}{current_net_io.bytes_recv / (1024**3):.2f} GB{Colors.RESET}")
             
-            self.last_disk_io = current_disk_io
+            self.clear_at(row + 5, col + 20, 30)
+            self.update_at(row + 5, col + 20, f"{Colors.MAGENTA}{current_net_io.packets_sent:,}{Colors.RESET}")
+            
+            self.clear_at(row + 6, col + 20, 30)
+            self.update_at(row + 6, col + 20, f"{Colors.MAGENTA}{current_net_io.packets_recv:,}{Colors.RESET}")
+            
+            self.clear_at(row + 7, col + 20, 30)
+            self.update_at(row + 7, col + 20, f"{Colors.RED}In:{current_net_io.errin} Out:{current_net_io.errout}{Colors.RESET}")
+
+    def update_disk_panel(self, snap):
+        row, col = self.rects['disk'][:2]
+        
+        disk = snap.get('disk')
+        if self.device_view:
+            self.update_devices(snap.get('disks'), row + 2, col, 5, 'disks')
+            return
+        if disk and disk.rates:
+            read_speed, write_speed = disk.rates
+            self.highlight(row + 1, col + 2, "📖 Read Speed:", 'disk.read')
+            self.highlight(row + 2, col + 2, "📝 Write Speed:", 'disk.write')
             
             self.clear_at(row + 1, col + 25, 25)
             self.update_at(row + 1, col + 25, f"{Colors.GREEN}{read_speed:.2f} MB/s{Colors.RESET}")
+            self.update_at(row + 1, col + 37, self.draw_history(self.history.disk_read, 11))
             
             self.clear_at(row + 2, col + 25, 25)
             self.update_at(row + 2, col + 25, f"{Colors.GREEN}{write_speed:.2f} MB/s{Colors.RESET}")
+            self.update_at(row + 2, col + 37, self.draw_history(self.history.disk_write, 11))
+        elif disk or 'disk' not in snap:
+            # A missing key means not sampled yet; None means the host has no disks to report
+            for i in (1, 2):
+                self.clear_at(row + i, col + 25, 25)
+                self.update_at(row + i, col + 25, WARMING_UP)
+        if disk:
+            current_disk_io = disk.counters
             
             self.clear_at(row + 3, col + 25, 25)
             self.update_at(row + 3, col + 25, f"{Colors.CYAN}{current_disk_io.read_bytes / (1024**3):.2f} GB{Colors.RESET}")
@@ -363,72 +2203,1439 @@ class GalaxyManager:
             
             self.clear_at(row + 6, col + 25, 25)
             self.update_at(row + 6, col + 25, f"{Colors.MAGENTA}{current_disk_io.write_count:,}{Colors.RESET}")
-        except:
-            pass
+
+    def update_process_panel(self, snap):
+        row, center_col = self.rects['processes'][:2]
         
-        center_col = (self.terminal_width - 100) // 2
-        row = self.terminal_height - 9
+        groups = snap.get('process_groups')
+        if groups is not None and getattr(self.sampler, 'process_view', 'flat') != 'flat':
+            self.update_process_groups(groups, self.sampler.process_view, row, center_col)
+            return
         
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'num_threads', 'status']):
-            try:
-                info = proc.info
-                if info['name'] and 'System Idle Process' not in info['name']:
-                    processes.append(info)
-            except:
-                pass
-        
-        processes = sorted(processes, key=lambda x: x['cpu_percent'] or 0, reverse=True)
+        io_view = getattr(self.sampler, 'process_sort', None) in ProcessTable.IO_SORTS
+        if io_view:
+            header = f"║ {Colors.BOLD}{'PID':<8} {'NAME':<32} {'CPU%':<8} {'READ/s':>9}  {'WRITE/s':>9}  {'CONNS':>7}{Colors.RESET} ║"
+        else:
+            header = f"║ {Colors.BOLD}{'PID':<8} {'NAME':<32} {'CPU%':<8} {'MEM%':<8} {'THREADS':<9} {'STATUS':<10}{Colors.RESET} ║"
+        self.update_at(row + 1, center_col, header)
+        processes = snap.get('processes') or ()
         
         for i in range(5):
             if i < len(processes):
                 proc = processes[i]
-                pid = str(proc['pid'])[:7]
-                name = (proc['name'] or "N/A")[:31]
-                cpu = proc['cpu_percent'] or 0
-                mem = proc['memory_percent'] or 0
-                threads = proc['num_threads'] or 0
-                status = (proc['status'] or "N/A")[:9]
+                pid = str(proc.pid)[:7]
+                name = (proc.name or "N/A")[:31]
+                cpu = proc.cpu_percent or 0
+                mem = proc.memory_percent or 0
+                threads = proc.num_threads or 0
+                status = (proc.status or "N/A")[:9]
                 
-                if cpu > 50:
+                if self.alerts and any(self.alerts.firing(f"processes.{field}", proc.pid) for field in ('cpu', 'memory', 'io', 'connections')):
+                    color = f"{Colors.RED}{Colors.REVERSE}"
+                elif cpu > 50:
                     color = Colors.RED
                 elif cpu > 25:
                     color = Colors.YELLOW
                 else:
                     color = Colors.GREEN
                 
-                line = f"║ {color}{pid:<8} {name:<32} {cpu:>6.1f}%  {mem:>6.2f}%  {threads:>8}  {status:<10}{Colors.RESET} ║"
+                if io_view:
+                    read = format_rate(proc.read_rate)
+                    write = format_rate(proc.write_rate)
+                    conns = '-' if proc.connections is None else proc.connections
+                    line = f"║ {color}{pid:<8} {name:<32} {cpu:>6.1f}%  {read:>9}  {write:>9}  {conns:>7}{Colors.RESET} ║"
+                else:
+                    line = f"║ {color}{pid:<8} {name:<32} {cpu:>6.1f}%  {mem:>6.2f}%  {threads:>8}  {status:<10}{Colors.RESET} ║"
+            elif i == 0 and snap.get('processes') is None:
+                line = f"║ {Colors.DIM}{'warming up':<87}{Colors.RESET}║"
             else:
                 line = f"║{' ' * 88}║"
             
             self.clear_at(row + 2 + i, center_col, 100)
             self.update_at(row + 2 + i, center_col, line)
+
+    def update_process_groups(self, groups, view, row, col):
+        title = {'tree': 'PROCESS TREE', 'user': 'USER', 'cgroup': 'CGROUP'}[view]
+        header = f"║ {Colors.BOLD}{'PID':<8} {title:<32} {'CPU%':<8} {'MEM%':<8} {'THREADS':<9} {'PROCS':<10}{Colors.RESET} ║"
+        self.update_at(row + 1, col, header)
         
-        footer = f"{Colors.YELLOW}[Ctrl+C]{Colors.RESET} Exit  •  {Colors.CYAN}Refresh: 1s{Colors.RESET}  •  {Colors.GREEN}{datetime.now().strftime('%H:%M:%S')}{Colors.RESET}"
-        footer_col = (self.terminal_width - 50) // 2
-        self.clear_at(self.terminal_height, footer_col, 50)
-        self.update_at(self.terminal_height, footer_col, footer)
+        self.process_cursor = min(self.process_cursor, max(len(groups) - 1, 0))
+        offset = max(0, self.process_cursor - 4)
+        for i in range(5):
+            index = offset + i
+            if index < len(groups):
+                group = groups[index]
+                pid = str(group.key)[:7] if isinstance(group.key, int) else ''
+                prefix = '  ' * group.depth + ('  ' if group.expanded is None else ('▾ ' if group.expanded else '▸ '))
+                name = str(group.name or "N/A")
+                width = 31 - len(prefix)
+                if len(name) > width:
+                    name = '…' + name[1 - width:] if '/' in name else name[:width]
+                cpu = group.cpu_percent
+                
+                if cpu > 50:
+                    color = Colors.RED
+                elif cpu > 25:
+                    color = Colors.YELLOW
+                else:
+                    color = Colors.GREEN
+                if index == self.process_cursor:
+                    color += Colors.REVERSE
+                
+                line = f"║ {color}{pid:<8} {prefix + name:<32} {cpu:>6.1f}%  {group.memory_percent:>6.2f}%  {group.num_threads:>8}  {group.count:<10}{Colors.RESET} ║"
+            else:
+                line = f"║{' ' * 88}║"
+            
+            self.clear_at(row + 2 + i, col, 100)
+            self.update_at(row + 2 + i, col, line)
+
+    def update_plugin_panel(self, plugin, snap):
+        rect = self.rects.get(f'plugin.{plugin.name}')
+        if rect is None:
+            return
+        row, col = rect[:2]
+        value = snap.get(plugin.name)
+        lines = plugin.render(value) if value is not None else (f"{Colors.DIM}waiting for a sample{Colors.RESET}",)
+        for i in range(plugin.rows):
+            self.clear_at(row + 1 + i, col + 2, 47)
+            if i < len(lines):
+                self.update_at(row + 1 + i, col + 2, lines[i])
+
+    def update_footer(self, snap):
+        status = getattr(self.sampler, 'status', None)
+        if not status:
+            status = f"Refresh: auto {self.pacer.interval:g}s" if self.pacer else f"Refresh: {self.refresh:g}s"
+        clock = datetime.fromtimestamp(snap.get('time') or time.time()).strftime('%H:%M:%S')
+        footer = f"{Colors.YELLOW}[Ctrl+C]{Colors.RESET} Exit  •  {Colors.CYAN}{status}{Colors.RESET}  •  {Colors.GREEN}{clock}{Colors.RESET}"
+        row, footer_col, _, width = self.rects['footer']
+        self.clear_at(row, footer_col, width)
+        self.update_at(row, footer_col, footer)
 
     def run(self):
-        self.clear_screen_once()
-        print(f"{Colors.GREEN}Initializing Galaxy Manager...{Colors.RESET}")
-        time.sleep(1)
-        self.clear_screen_once()
-        
-        self.draw_static_layout()
-        
-        while self.running:
+        # The first frame goes out before sampling starts: the clear rides along with the static layout and every
+        # value reads "warming up", so nothing waits on collectors or an external 'clear'
+        self.screen.reset = True
+        self.profiler.timed('layout.static', self.draw_static_layout)
+        self.update_dynamic_data()
+        self.profiler.mark('first_frame')
+        self.sampler.start()
+        if self.pacer:
+            print(Colors.REPORT_FOCUS, end='', flush=True)
+        
+        next_frame = time.monotonic()
+        with KeyReader() as keys:
+            while self.running:
+                try:
+                    self.update_dynamic_data()
+                    step = self.pacer.update(self.sampler.snapshot) if self.pacer else self.refresh
+                    next_frame += min(step, Sampler.PRIME_DELAY) if self.warming else step
+                    delay = next_frame - time.monotonic()
+                    if delay <= 0:
+                        next_frame = time.monotonic()
+                    while delay > 0:
+                        pressed = keys.wait(delay)
+                        if pressed:
+                            for key in pressed:
+                                self.handle_key(key)
+                            self.update_dynamic_data()
+                            if self.pacer:
+                                next_frame = min(next_frame, time.monotonic() + self.pacer.interval)
+                        delay = next_frame - time.monotonic()
+                    
+                except KeyboardInterrupt:
+                    self.running = False
+                    print(f"\n\n{Colors.SHOW_CURSOR}{Colors.CYAN}Galaxy Manager terminated.{Colors.RESET}\n")
+                    break
+                except Exception as e:
+                    print(f"\n{Colors.SHOW_CURSOR}{Colors.RED}Error: {e}{Colors.RESET}")
+                    time.sleep(2)
+        
+        self.sampler.stop()
+        if self.recorder:
+            self.recorder.close()
+        print(Colors.IGNORE_FOCUS + Colors.SHOW_CURSOR if self.pacer else Colors.SHOW_CURSOR, end='', flush=True)
+
+    def handle_key(self, key):
+        if key == 'q':
+            self.running = False
+            return
+        if key in ('focus-in', 'focus-out'):
+            if self.pacer:
+                self.pacer.focus(key == 'focus-in')
+            return
+        if key == 'resize':
+            self.profiler.timed('layout.resize', self.resize)
+            return
+        if self.pacer:
+            self.pacer.focus(True)
+        if key == 'i':
+            self.device_view = not self.device_view
+            self.draw_io_layout()
+            return
+        sort = getattr(self.sampler, 'process_sort', None)
+        if key == 's' and sort is not None:
+            keys = list(ProcessTable.SORT_KEYS)
+            self.sampler.process_sort = keys[(keys.index(sort) + 1) % len(keys)]
+            self.sampler.request('processes')
+            self.sampler.request('process_groups')
+            return
+        view = getattr(self.sampler, 'process_view', None)
+        if key == 'g' and view is not None:
+            views = self.sampler.PROCESS_VIEWS
+            self.sampler.process_view = views[(views.index(view) + 1) % len(views)]
+            self.sampler.process_toggled = set()
+            self.process_cursor = 0
+            self.sampler.request('process_groups')
+            return
+        if view not in (None, 'flat') and key in ('up', 'down', '\n', '\r', ' '):
+            rows = self.sampler.snapshot.get('process_groups') or ()
+            if key == 'up':
+                self.process_cursor = max(self.process_cursor - 1, 0)
+            elif key == 'down':
+                self.process_cursor = min(self.process_cursor + 1, max(len(rows) - 1, 0))
+            elif self.process_cursor < len(rows) and rows[self.process_cursor].expanded is not None:
+                self.sampler.process_toggled = self.sampler.process_toggled ^ {rows[self.process_cursor].key}
+                self.sampler.request('process_groups')
+            return
+        if key == 'p':
+            self.show_profile = not self.show_profile
+            if not self.show_profile:
+                self.profiler.timed('layout.static', self.draw_static_layout)
+            return
+        handler = getattr(self.sampler, 'handle_key', None)
+        if handler:
+            handler(key)
+
+def plain(value):
+    if hasattr(value, '_asdict'):
+        return {key: plain(item) for key, item in value._asdict().items()}
+    if isinstance(value, (tuple, list)):
+        return [plain(item) for item in value]
+    return value
+
+def snapshot_to_json(snapshot):
+    return json.dumps({key: plain(value) for key, value in snapshot.items() if key not in Sampler.INTERNAL_KEYS}, separators=(',', ':'), default=str)
+
+def snapshot_to_prometheus(snapshot):
+    lines = []
+    
+    def metric(name, kind, samples):
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        if not samples:
+            return
+        lines.append(f"# TYPE galaxy_{name} {kind}")
+        for labels, value in samples:
+            label_str = ','.join(f'{key}="{item}"' for key, item in labels)
+            lines.append(f"galaxy_{name}{{{label_str}}} {value}" if labels else f"galaxy_{name} {value}")
+    
+    system = snapshot.get('system')
+    if system:
+        metric('boot_time_seconds', 'gauge', [((), system.boot_time)])
+        metric('cpu_cores', 'gauge', [((('kind', 'physical'),), system.physical_cores), ((('kind', 'logical'),), system.logical_cores)])
+    
+    cpu = snapshot.get('cpu')
+    if cpu:
+        metric('cpu_percent', 'gauge', [((), cpu.total)])
+        metric('cpu_core_percent', 'gauge', [((('core', i),), percent) for i, percent in enumerate(cpu.percpu)])
+    
+    cpu_info = snapshot.get('cpu_info')
+    if cpu_info:
+        if cpu_info.freq:
+            metric('cpu_frequency_mhz', 'gauge', [((), cpu_info.freq.current)])
+        metric('cpu_context_switches_total', 'counter', [((), cpu_info.stats.ctx_switches)])
+        metric('cpu_interrupts_total', 'counter', [((), cpu_info.stats.interrupts)])
+    
+    memory = snapshot.get('memory')
+    if memory:
+        mem = memory.virtual
+        metric('memory_bytes', 'gauge', [((('type', field),), getattr(mem, field, None))
+                                         for field in ('total', 'used', 'free', 'available', 'cached', 'buffers')])
+        metric('swap_bytes', 'gauge', [((('type', 'total'),), memory.swap.total), ((('type', 'used'),), memory.swap.used)])
+    
+    net = snapshot.get('net')
+    if net:
+        counters = net.counters
+        metric('network_bytes_total', 'counter', [((('direction', 'sent'),), counters.bytes_sent), ((('direction', 'recv'),), counters.bytes_recv)])
+        metric('network_packets_total', 'counter', [((('direction', 'sent'),), counters.packets_sent), ((('direction', 'recv'),), counters.packets_recv)])
+        metric('network_errors_total', 'counter', [((('direction', 'in'),), counters.errin), ((('direction', 'out'),), counters.errout)])
+    
+    disk = snapshot.get('disk')
+    if disk:
+        counters = disk.counters
+        metric('disk_bytes_total', 'counter', [((('direction', 'read'),), counters.read_bytes), ((('direction', 'write'),), counters.write_bytes)])
+        metric('disk_operations_total', 'counter', [((('direction', 'read'),), counters.read_count), ((('direction', 'write'),), counters.write_count)])
+    
+    nics = snapshot.get('nics')
+    if nics:
+        metric('network_device_kbytes_per_second', 'gauge', [((('device', nic.name), ('direction', direction)), rate)
+                                                             for nic in nics for direction, rate in (('sent', nic.sent), ('recv', nic.recv))])
+    
+    disks = snapshot.get('disks')
+    if disks:
+        metric('disk_device_mbytes_per_second', 'gauge', [((('device', disk.name), ('direction', direction)), rate)
+                                                          for disk in disks for direction, rate in (('read', disk.read), ('write', disk.write))])
+    
+    metric('temperature_celsius', 'gauge', [((), snapshot.get('temperature'))])
+    battery = snapshot.get('battery')
+    if battery:
+        metric('battery_percent', 'gauge', [((), battery.percent)])
+    
+    lines.append('')
+    return '\n'.join(lines)
+
+ALERT_METRICS = {
+    'cpu': ('cpu', False, lambda cpu: cpu.total, '%'),
+    'cpu.core': ('cpu', True, lambda cpu: enumerate(cpu.percpu), '%'),
+    'memory': ('memory', False, lambda memory: memory.virtual.percent, '%'),
+    'swap': ('memory', False, lambda memory: memory.swap.percent, '%'),
+    'temperature': ('temperature', False, lambda temp: temp, 'C'),
+    'battery': ('battery', False, lambda battery: battery.percent, '%'),
+    'net.up': ('net', False, lambda net: net.rates[0] if net.rates else None, 'KB/s'),
+    'net.down': ('net', False, lambda net: net.rates[1] if net.rates else None, 'KB/s'),
+    'disk.read': ('disk', False, lambda disk: disk.rates[0] if disk.rates else None, 'MB/s'),
+    'disk.write': ('disk', False, lambda disk: disk.rates[1] if disk.rates else None, 'MB/s'),
+    'nics.sent': ('nics', True, lambda nics: ((nic.name, nic.sent) for nic in nics), 'KB/s'),
+    'nics.recv': ('nics', True, lambda nics: ((nic.name, nic.recv) for nic in nics), 'KB/s'),
+    'disks.read': ('disks', True, lambda disks: ((disk.name, disk.read) for disk in disks), 'MB/s'),
+    'disks.write': ('disks', True, lambda disks: ((disk.name, disk.write) for disk in disks), 'MB/s'),
+    'processes.cpu': ('process_series', True, lambda procs: ((proc.pid, proc.cpu_percent or 0) for proc in procs), '%'),
+    'processes.memory': ('process_series', True, lambda procs: ((proc.pid, proc.memory_percent or 0) for proc in procs), '%'),
+    'processes.io': ('process_series', True, lambda procs: ((proc.pid, ((proc.read_rate or 0) + (proc.write_rate or 0)) / 1024**2) for proc in procs), 'MB/s'),
+    'processes.connections': ('process_series', True, lambda procs: ((proc.pid, proc.connections or 0) for proc in procs), None),
+}
+# Live samplers publish every process under 'process_series'; recordings and remote hosts only carry the top rows
+ALERT_FALLBACKS = {'process_series': 'processes'}
+
+ALERT_OPS = {'>': gt, '>=': ge, '<': lt, '<=': le}
+# Threshold suffix -> (dimension, scale); thresholds are converted to the metric's own unit from ALERT_METRICS
+ALERT_UNITS = {'%': ('%', 1), 'C': ('C', 1), '°C': ('C', 1), 'KB/s': ('B/s', 1024), 'MB/s': ('B/s', 1024**2), 'GB/s': ('B/s', 1024**3)}
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+RULE_RE = re.compile(r'^(?:(?P<name>[\w.-]+)\s*:\s*)?(?P<metric>[\w.]+)\s*(?P<op>>=|<=|>|<)\s*(?P<threshold>-?\d+(?:\.\d+)?)\s*(?P<suffix>%|°?C|[KMG]B/s)?'
+                     r'(?:\s+(?P<mode>for|avg over)\s+(?P<window>\d+(?:\.\d+)?)(?P<unit>ms|s|m|h))?\s*$')
+
+Alert = namedtuple('Alert', ['time', 'rule', 'metric', 'key', 'value', 'threshold', 'state', 'text'])
+
+class SlidingWindow:
+    BUCKETS = 12
+
+    def __init__(self, span):
+        self.width = span / self.BUCKETS
+        self.sums = array('d', bytes(8 * self.BUCKETS))
+        self.counts = array('I', bytes(4 * self.BUCKETS))
+        self.total = 0.0
+        self.count = 0
+        self.slot = None
+
+    def add(self, t, value):
+        slot = int(t / self.width)
+        if slot != self.slot:
+            sums = self.sums
+            counts = self.counts
+            if self.slot is None or not 0 < slot - self.slot < self.BUCKETS:
+                for i in range(self.BUCKETS):
+                    sums[i] = 0.0
+                    counts[i] = 0
+                self.total = 0.0
+                self.count = 0
+            else:
+                # Expire the buckets we moved past; at most BUCKETS of them, so this stays O(1)
+                for s in range(self.slot + 1, slot + 1):
+                    i = s % self.BUCKETS
+                    self.total -= sums[i]
+                    self.count -= counts[i]
+                    sums[i] = 0.0
+                    counts[i] = 0
+            self.slot = slot
+        i = slot % self.BUCKETS
+        self.sums[i] += value
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+class AlertRule:
+    def __init__(self, name, metric, op, threshold, mode=None, window=0.0, text='', unit=None):
+        if metric not in ALERT_METRICS:
+            raise ValueError(f"unknown metric '{metric}' (known: {', '.join(ALERT_METRICS)})")
+        native = ALERT_METRICS[metric][3]
+        if unit and unit != native:
+            if native is None or ALERT_UNITS[unit][0] != ALERT_UNITS[native][0]:
+                raise ValueError(f"'{metric}' is measured in {native or 'plain counts'}, not {unit}")
+            threshold = threshold * ALERT_UNITS[unit][1] / ALERT_UNITS[native][1]
+        self.name = name
+        self.metric = metric
+        self.compare = ALERT_OPS[op]
+        self.threshold = threshold
+        self.average = mode == 'avg over'
+        self.window = window
+        self.text = text
+        self.state = {}
+
+    def update(self, now, samples):
+        # Returns (key, value, firing) for every series whose state flipped; series missing from samples are dropped
+        changes = []
+        old = self.state
+        state = self.state = {}
+        for key, value in samples:
+            if value is None:
+                continue
+            entry = old.pop(key, None)
+            if self.average:
+                if entry is None:
+                    entry = [SlidingWindow(self.window), now, False]
+                entry[0].add(now, value)
+                value = entry[0].average()
+                active = now - entry[1] >= self.window - entry[0].width and self.compare(value, self.threshold)
+            elif self.compare(value, self.threshold):
+                if entry is None:
+                    entry = [None, now, False]
+                active = now - entry[1] >= self.window
+            else:
+                active = False
+                if entry is not None and entry[2]:
+                    changes.append((key, value, False))
+                continue
+            if active != entry[2]:
+                entry[2] = active
+                changes.append((key, value, active))
+            state[key] = entry
+        for key, entry in old.items():
+            if entry[2]:
+                changes.append((key, None, False))
+        return changes
+
+def parse_rules(lines):
+    rules = []
+    names = set()
+    for number, line in enumerate(lines, 1):
+        text = line.split('#', 1)[0].strip()
+        if not text:
+            continue
+        match = RULE_RE.match(text)
+        if not match:
+            raise ValueError(f"line {number}: cannot parse rule '{text}'")
+        name = match.group('name') or f"rule{number}"
+        if name in names:
+            raise ValueError(f"line {number}: duplicate rule name '{name}'")
+        names.add(name)
+        window = float(match.group('window')) * DURATION_UNITS[match.group('unit')] if match.group('window') else 0.0
+        try:
+            rules.append(AlertRule(name, match.group('metric'), match.group('op'), float(match.group('threshold')),
+                                   match.group('mode'), window, text, match.group('suffix')))
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}")
+    return rules
+
+def load_rules(path):
+    with open(path, encoding='utf-8') as f:
+        return parse_rules(f)
+
+class AlertLog:
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def send(self, alert):
+        self.file.write(json.dumps(alert._asdict(), separators=(',', ':'), default=str) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class AlertWebhook:
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=1000)
+        self.thread = threading.Thread(target=self._deliver, name='galaxy-webhook', daemon=True)
+        self.thread.start()
+
+    def send(self, alert):
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            pass
+
+    def _deliver(self):
+        import urllib.request
+        while True:
+            alert = self.queue.get()
+            if alert is None:
+                return
+            body = json.dumps(alert._asdict(), default=str).encode('utf-8')
+            request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
             try:
-                self.update_dynamic_data()
-                time.sleep(1)
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=self.timeout)
+
+class AlertEngine:
+    def __init__(self, rules, sinks=()):
+        self.rules = rules
+        self.sinks = list(sinks)
+        self.sources = {}
+        for rule in rules:
+            source, keyed, extract, _ = ALERT_METRICS[rule.metric]
+            metrics = self.sources.setdefault(source, {})
+            metrics.setdefault(rule.metric, (keyed, extract, []))[2].append(rule)
+        self.last = {}
+        self.active = {}
+        self.firing_keys = {}
+
+    def evaluate(self, snapshot):
+        now = snapshot.get('time') or time.time()
+        alerts = []
+        for source, metrics in self.sources.items():
+            value = snapshot.get(source)
+            if value is None and source in ALERT_FALLBACKS:
+                value = snapshot.get(ALERT_FALLBACKS[source])
+            # Collectors publish a new object per sample, so an unchanged object means nothing to evaluate
+            if value is None or value is self.last.get(source):
+                continue
+            self.last[source] = value
+            for metric, (keyed, extract, rules) in metrics.items():
+                try:
+                    samples = list(extract(value)) if keyed else [(None, extract(value))]
+                except (AttributeError, TypeError, IndexError):
+                    continue
+                for rule in rules:
+                    for key, sample, firing in rule.update(now, samples):
+                        alerts.append(self.transition(now, rule, key, sample, firing))
+        for alert in alerts:
+            for sink in self.sinks:
+                sink.send(alert)
+        return alerts
+
+    def transition(self, now, rule, key, value, firing):
+        alert = Alert(now, rule.name, rule.metric, key, value, rule.threshold, 'firing' if firing else 'resolved', rule.text)
+        keys = self.firing_keys.setdefault(rule.metric, {})
+        if firing:
+            self.active[rule.name, key] = alert
+            keys[key] = keys.get(key, 0) + 1
+        else:
+            self.active.pop((rule.name, key), None)
+            if keys.get(key, 0) > 1:
+                keys[key] -= 1
+            else:
+                keys.pop(key, None)
+        return alert
+
+    def firing(self, metric, key=None):
+        keys = self.firing_keys.get(metric)
+        return bool(keys) and key in keys
+
+    def close(self):
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close:
+                close()
+
+class HeadlessExporter:
+    def __init__(self, sampler, refresh=1.0, output='-', prometheus=None, recorder=None, alerts=None, pacer=None):
+        self.sampler = sampler
+        self.refresh = refresh
+        self.output = output
+        self.prometheus = prometheus
+        self.recorder = recorder
+        self.alerts = alerts
+        self.pacer = pacer
+        self.running = True
+        self.server = None
+
+    def serve_prometheus(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        sampler = self.sampler
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = snapshot_to_prometheus(sampler.snapshot).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        host, port = self.prometheus
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, name='galaxy-prometheus', daemon=True).start()
+
+    def run(self):
+        self.sampler.start()
+        if self.prometheus:
+            self.serve_prometheus()
+        stream = None
+        if self.output:
+            stream = sys.stdout if self.output == '-' else open(self.output, 'a', encoding='utf-8')
+        
+        last_time = None
+        next_tick = time.monotonic()
+        try:
+            while self.running:
+                next_tick += self.pacer.update(self.sampler.snapshot) if self.pacer else self.refresh
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.monotonic()
                 
-            except KeyboardInterrupt:
-                self.running = False
-                print(f"\n\n{Colors.SHOW_CURSOR}{Colors.CYAN}Galaxy Manager terminated.{Colors.RESET}\n")
+                snapshot = self.sampler.snapshot
+                if snapshot.get('time') == last_time:
+                    continue
+                last_time = snapshot.get('time')
+                if stream:
+                    stream.write(snapshot_to_json(snapshot) + '\n')
+                    stream.flush()
+                if self.recorder:
+                    self.recorder.append(snapshot)
+                if self.alerts:
+                    self.alerts.evaluate(snapshot)
+                if getattr(self.sampler, 'finished', False):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.sampler.stop()
+            if self.recorder:
+                self.recorder.close()
+            if self.server:
+                self.server.shutdown()
+            if stream and stream is not sys.stdout:
+                stream.close()
+
+PROC_STATUSES = ('running', 'sleeping', 'disk-sleep', 'stopped', 'tracing-stop', 'zombie', 'dead',
+                 'wake-kill', 'waking', 'idle', 'locked', 'waiting', 'suspended', 'parked')
+
+CODECS = {'none': 0, 'zlib': 1, 'zstd': 2}
+
+class RecordingFormat:
+    MAGIC = b'GALAXYR1'
+    VERSION = 1
+    HEADER = struct.Struct('<8sHHdHHH')
+    BLOCK = struct.Struct('<4sdIBII')
+    BLOCK_MAGIC = b'GXBK'
+    KEYFRAME = struct.Struct('<d12QQQf')
+    RECORD = struct.Struct('<IHH5IIH2I2Q4I2I2QhBBB')
+    PROC = struct.Struct('<IHHHBB')
+    INDEX = struct.Struct('<dQI')
+    COUNTER_LIMITS = (0xFFFFFFFF,) * 2 + (0xFFFFFFFFFFFFFFFF,) * 2 + (0xFFFFFFFF,) * 6 + (0xFFFFFFFFFFFFFFFF,) * 2
+
+    @staticmethod
+    def compress(codec, data):
+        if codec == 1:
+            return zlib.compress(data, 6)
+        if codec == 2:
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return data
+
+    @staticmethod
+    def decompress(codec, data):
+        if codec == 1:
+            return zlib.decompress(data)
+        if codec == 2:
+            if zstandard is None:
+                raise ValueError("recording is zstd compressed and the 'zstandard' package is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+def encode_system(system, cores):
+    fmt = RecordingFormat
+    os_name = system.os.encode('utf-8')
+    return fmt.HEADER.pack(fmt.MAGIC, fmt.VERSION, cores, system.boot_time,
+                           system.physical_cores or 0, system.logical_cores or 0, len(os_name)) + os_name
+
+def decode_system(data):
+    fmt = RecordingFormat
+    if len(data) < fmt.HEADER.size or data[:8] != fmt.MAGIC:
+        raise ValueError("not a Galaxy Manager header")
+    _, _, cores, boot_time, physical, logical, os_len = fmt.HEADER.unpack_from(data)
+    os_name = bytes(data[fmt.HEADER.size:fmt.HEADER.size + os_len]).decode('utf-8', 'replace')
+    return SystemInfo(os_name, boot_time, physical, logical), cores, fmt.HEADER.size + os_len
+
+def decode_block(raw, count, block_time, cores, system):
+    fmt = RecordingFormat
+    keyframe = fmt.KEYFRAME.unpack_from(raw, 0)
+    prev_time = keyframe[0]
+    counters = list(keyframe[1:13])
+    mem_total, swap_total, freq_max = keyframe[13:]
+    offset = fmt.KEYFRAME.size
+    snapshots = []
+    for _ in range(count):
+        fields = fmt.RECORD.unpack_from(raw, offset)
+        offset += fmt.RECORD.size
+        percpu = tuple(q / 2 for q in raw[offset:offset + cores])
+        offset += cores
+        processes = []
+        for _ in range(fields[-1]):
+            pid, cpu, mem, threads, status, name_len = fmt.PROC.unpack_from(raw, offset)
+            offset += fmt.PROC.size
+            name = bytes(raw[offset:offset + name_len]).decode('utf-8', 'replace')
+            offset += name_len
+            processes.append(ProcInfo(pid, name, cpu / 10, mem / 100, threads,
+                                      PROC_STATUSES[status] if status < len(PROC_STATUSES) else 'N/A'))
+        
+        now = block_time + fields[0] / 1000
+        deltas = fields[10:22]
+        counters = [c + d for c, d in zip(counters, deltas)]
+        elapsed = now - prev_time
+        net_rates = (deltas[2] / elapsed / 1024, deltas[3] / elapsed / 1024) if elapsed > 0 else None
+        disk_rates = (deltas[10] / elapsed / 1024**2, deltas[11] / elapsed / 1024**2) if elapsed > 0 else None
+        prev_time = now
+        
+        kib = lambda value: value << 10
+        used, swap_used = kib(fields[4]), kib(fields[8])
+        temp, battery, plugged = fields[22:25]
+        snapshots.append((now, MappingProxyType({
+            'time': now,
+            'system': system,
+            'cpu': CpuSample(fields[1] / 100, percpu),
+            'cpu_info': CpuInfo(CpuFreq(fields[9], 0.0, freq_max), CpuStats(counters[0], counters[1], 0, 0)),
+            'memory': MemorySample(
+                VirtualMemory(mem_total, kib(fields[3]), fields[2] / 100, used, kib(fields[5]), kib(fields[6]), kib(fields[7])),
+                SwapMemory(swap_total, swap_used, swap_total - swap_used, swap_used * 100 / swap_total if swap_total else 0.0)),
+            'net': RateSample(NetIO(*counters[2:8]), net_rates),
+            'disk': RateSample(DiskIO(*counters[8:12]), disk_rates),
+            'temperature': temp / 10 if temp != -32768 else None,
+            'battery': Battery(battery, None, bool(plugged)) if battery != 255 else None,
+            'processes': tuple(processes),
+        })))
+    return snapshots
+
+def snapshot_counters(snapshot):
+    stats = snapshot['cpu_info'].stats
+    net = snapshot['net'].counters
+    disk = snapshot['disk'].counters if snapshot.get('disk') else DiskIO(0, 0, 0, 0)
+    return (stats.ctx_switches, stats.interrupts,
+            net.bytes_sent, net.bytes_recv, net.packets_sent, net.packets_recv, net.errin, net.errout,
+            disk.read_count, disk.write_count, disk.read_bytes, disk.write_bytes)
+
+class SnapshotEncoder:
+    BLOCK_RECORDS = 60
+    # Records only reach the file when their block closes, so this bounds what a crash can lose
+    BLOCK_SECONDS = 15
+    REQUIRED = ('system', 'cpu', 'cpu_info', 'memory', 'net')
+
+    def __init__(self):
+        self.cores = None
+        self.records = []
+        self.block_time = None
+        self.keyframe = None
+        self.prev_time = None
+        self.prev_counters = None
+
+    def open(self, snapshot):
+        self.cores = len(snapshot['cpu'].percpu)
+
+    def append(self, snapshot):
+        if any(not snapshot.get(key) for key in self.REQUIRED):
+            return False
+        if self.cores is None:
+            self.open(snapshot)
+        
+        now = snapshot['time']
+        counters = snapshot_counters(snapshot)
+        if self.prev_counters is None:
+            self.prev_time, self.prev_counters = now, counters
+        deltas = tuple(c - p for c, p in zip(counters, self.prev_counters))
+        overflow = any(d < 0 or d > limit for d, limit in zip(deltas, RecordingFormat.COUNTER_LIMITS))
+        if self.records and (overflow or len(self.records) >= self.BLOCK_RECORDS or now - self.block_time >= self.BLOCK_SECONDS):
+            self.flush()
+        if overflow:
+            self.prev_time, self.prev_counters = now, counters
+            deltas = (0,) * len(deltas)
+        if not self.records:
+            memory = snapshot['memory']
+            freq = snapshot['cpu_info'].freq
+            self.block_time = now
+            self.keyframe = RecordingFormat.KEYFRAME.pack(self.prev_time, *self.prev_counters, memory.virtual.total,
+                                                          memory.swap.total, freq.max if freq else 0.0)
+        
+        self.records.append(self.pack_record(snapshot, now, deltas))
+        self.prev_time, self.prev_counters = now, counters
+        return True
+
+    def pack_record(self, snapshot, now, deltas):
+        mem = snapshot['memory'].virtual
+        swap = snapshot['memory'].swap
+        freq = snapshot['cpu_info'].freq
+        temp = snapshot.get('temperature')
+        battery = snapshot.get('battery')
+        processes = (snapshot.get('processes') or ())[:255]
+        kib = lambda value: min(int(value) >> 10, 0xFFFFFFFF)
+        fixed = RecordingFormat.RECORD.pack(
+            int((now - self.block_time) * 1000), int(snapshot['cpu'].total * 100), int(mem.percent * 100),
+            kib(mem.available), kib(mem.used), kib(mem.free), kib(getattr(mem, 'cached', 0)), kib(getattr(mem, 'buffers', 0)),
+            kib(swap.used), min(int(freq.current if freq else 0), 0xFFFF), *deltas,
+            max(min(int(temp * 10), 32767), -32767) if temp is not None else -32768,
+            min(int(battery.percent), 254) if battery else 255, 1 if battery and battery.power_plugged else 0,
+            len(processes))
+        percpu = bytes(min(int(p * 2 + 0.5), 255) for p in snapshot['cpu'].percpu[:self.cores]).ljust(self.cores, b'\0')
+        parts = [fixed, percpu]
+        for proc in processes:
+            name = (proc.name or '').encode('utf-8')[:255]
+            status = PROC_STATUSES.index(proc.status) if proc.status in PROC_STATUSES else 255
+            parts.append(RecordingFormat.PROC.pack(proc.pid, min(int((proc.cpu_percent or 0) * 10), 0xFFFF),
+                                                   min(int((proc.memory_percent or 0) * 100), 0xFFFF),
+                                                   min(proc.num_threads or 0, 0xFFFF), status, len(name)))
+            parts.append(name)
+        return b''.join(parts)
+
+    def flush(self):
+        pass
+
+    def take_block(self):
+        if not self.records:
+            return None
+        block = (self.block_time, len(self.records), self.keyframe + b''.join(self.records))
+        self.records = []
+        return block
+
+class Recorder(SnapshotEncoder):
+    def __init__(self, path, codec='zlib'):
+        super().__init__()
+        self.path = path
+        self.codec = CODECS[codec]
+        self.file = None
+        self.index = None
+
+    def open_file(self, system, cores):
+        fmt = RecordingFormat
+        file = open(self.path, 'ab')
+        try:
+            if file.tell() == 0:
+                file.write(encode_system(system, cores))
+                file.flush()
+                # A fresh recording must not inherit block offsets from an index left behind by an older one
+                self.index = open(self.path + '.idx', 'wb')
+            else:
+                with open(self.path, 'rb') as existing:
+                    header = existing.read(fmt.HEADER.size)
+                if len(header) < fmt.HEADER.size or header[:8] != fmt.MAGIC or fmt.HEADER.unpack(header)[2] != cores:
+                    raise ValueError(f"{self.path} is not a {cores}-core Galaxy Manager recording")
+                self.index = open(self.path + '.idx', 'ab')
+        except:
+            file.close()
+            raise
+        self.file = file
+        self.cores = cores
+
+    def flush(self):
+        block = self.take_block()
+        if not block:
+            return
+        fmt = RecordingFormat
+        block_time, count, raw = block
+        payload = fmt.compress(self.codec, raw)
+        offset = self.file.tell()
+        self.file.write(fmt.BLOCK.pack(fmt.BLOCK_MAGIC, block_time, count, self.codec, len(raw), len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        self.index.write(fmt.INDEX.pack(block_time, offset, count))
+        self.index.flush()
+
+    def close(self):
+        if self.file:
+            self.flush()
+            self.file.close()
+            self.index.close()
+            self.file = None
+
+class RecordingReader:
+    def __init__(self, path):
+        fmt = RecordingFormat
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.system, self.cores, self.data_start = decode_system(self.file.read(fmt.HEADER.size + 0xFFFF))
+        except (ValueError, struct.error):
+            raise ValueError(f"{path} is not a Galaxy Manager recording")
+        self.index = self.load_index()
+        self.blocks = len(self.index) // fmt.INDEX.size
+        if not self.blocks:
+            raise ValueError(f"{path} has no complete blocks")
+        self.cache = {}
+        self.start_time = self.entry(0)[0]
+        self.end_time = self.read_block(self.blocks - 1)[-1][0]
+
+    def block_header(self, offset, data_size):
+        fmt = RecordingFormat
+        if offset + fmt.BLOCK.size > data_size:
+            return None
+        self.file.seek(offset)
+        header = fmt.BLOCK.unpack(self.file.read(fmt.BLOCK.size))
+        if header[0] != fmt.BLOCK_MAGIC or offset + fmt.BLOCK.size + header[5] > data_size:
+            return None
+        return header
+
+    def load_index(self):
+        fmt = RecordingFormat
+        index_path = self.path + '.idx'
+        data_size = os.path.getsize(self.path)
+        index = b''
+        try:
+            if os.path.getsize(index_path):
+                with open(index_path, 'rb') as f:
+                    index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            pass
+        
+        # A clean close leaves an index whose first block starts at the header and whose last block ends the data;
+        # checking just those two keeps opening a day-long recording O(1)
+        count = len(index) // fmt.INDEX.size
+        if count and count * fmt.INDEX.size == len(index):
+            first = fmt.INDEX.unpack_from(index, 0)
+            last = fmt.INDEX.unpack_from(index, (count - 1) * fmt.INDEX.size)
+            header = self.block_header(last[1], data_size)
+            if first[1] == self.data_start and header and last[1] + fmt.BLOCK.size + header[5] == data_size:
+                return index
+        
+        # Otherwise keep the prefix of indexed blocks that chain from the header and rescan the rest
+        entries = []
+        offset = self.data_start
+        for i in range(len(index) // fmt.INDEX.size):
+            entry = fmt.INDEX.unpack_from(index, i * fmt.INDEX.size)
+            header = self.block_header(entry[1], data_size)
+            if entry[1] != offset or header is None:
+                break
+            entries.append(fmt.INDEX.pack(*entry))
+            offset += fmt.BLOCK.size + header[5]
+        if offset == data_size and len(entries) * fmt.INDEX.size == len(index):
+            return index
+        if isinstance(index, mmap.mmap):
+            index.close()
+        
+        while True:
+            header = self.block_header(offset, data_size)
+            if header is None:
                 break
+            _, first_time, count, _, _, payload_len = header
+            entries.append(fmt.INDEX.pack(first_time, offset, count))
+            offset += fmt.BLOCK.size + payload_len
+        index = b''.join(entries)
+        try:
+            with open(index_path, 'wb') as f:
+                f.write(index)
+        except OSError:
+            pass
+        return index
+
+    def entry(self, i):
+        return RecordingFormat.INDEX.unpack_from(self.index, i * RecordingFormat.INDEX.size)
+
+    def find_block(self, t):
+        lo, hi = 0, self.blocks - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.entry(mid)[0] <= t:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def read_block(self, i):
+        if i in self.cache:
+            return self.cache[i]
+        fmt = RecordingFormat
+        self.file.seek(self.entry(i)[1])
+        try:
+            _, block_time, count, codec, _, payload_len = fmt.BLOCK.unpack(self.file.read(fmt.BLOCK.size))
+            raw = fmt.decompress(codec, self.file.read(payload_len))
+            snapshots = decode_block(raw, count, block_time, self.cores, self.system)
+        except (struct.error, zlib.error) as e:
+            raise ValueError(f"{self.path}: block {i} is damaged ({e})")
+        
+        if len(self.cache) > 8:
+            self.cache.clear()
+        self.cache[i] = snapshots
+        return snapshots
+
+    def snapshot_at(self, t):
+        records = self.read_block(self.find_block(t))
+        lo, hi = 0, len(records) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if records[mid][0] <= t:
+                lo = mid
+            else:
+                hi = mid - 1
+        return records[lo][1]
+
+    def close(self):
+        if isinstance(self.index, mmap.mmap):
+            self.index.close()
+        self.file.close()
+
+class ReplaySource:
+    def __init__(self, path, speed=1.0, seek=0.0):
+        self.reader = RecordingReader(path)
+        self.cores = self.reader.cores
+        self.speed = speed
+        self.paused = False
+        self.position = self.reader.start_time
+        self.anchor = time.monotonic()
+        self.seek(seek)
+
+    def now(self):
+        if self.paused:
+            return self.position
+        return min(self.position + (time.monotonic() - self.anchor) * self.speed, self.reader.end_time)
+
+    def seek(self, seconds):
+        self.position = max(self.reader.start_time, min(self.now() + seconds, self.reader.end_time))
+        self.anchor = time.monotonic()
+
+    def set_speed(self, speed):
+        self.position = self.now()
+        self.anchor = time.monotonic()
+        self.speed = max(0.125, min(speed, 1024))
+
+    def handle_key(self, key):
+        if key == ' ':
+            self.position = self.now()
+            self.anchor = time.monotonic()
+            self.paused = not self.paused
+        elif key in ('left', 'right', 'up', 'down'):
+            self.seek({'left': -10, 'right': 10, 'down': -60, 'up': 60}[key])
+        elif key in ('[', ']'):
+            self.set_speed(self.speed / 2 if key == '[' else self.speed * 2)
+
+    @property
+    def finished(self):
+        return not self.paused and self.now() >= self.reader.end_time
+
+    @property
+    def status(self):
+        return 'Paused' if self.paused else f"Replay {self.speed:g}x"
+
+    @property
+    def snapshot(self):
+        return self.reader.snapshot_at(self.now())
+
+    def start(self):
+        self.anchor = time.monotonic()
+
+    def stop(self):
+        self.reader.close()
+
+class KeyReader:
+    SEQUENCES = {'\033[A': 'up', '\033[B': 'down', '\033[C': 'right', '\033[D': 'left', '\033[I': 'focus-in', '\033[O': 'focus-out'}
+
+    def __init__(self):
+        self.fd = None
+        self.saved = None
+        self.wake = None
+        self.saved_winch = None
+
+    def __enter__(self):
+        if platform.system() != 'Windows' and sys.stdin.isatty():
+            import termios
+            import tty
+            self.fd = sys.stdin.fileno()
+            self.saved = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+            if threading.current_thread() is threading.main_thread():
+                # SIGWINCH only sets a byte in a pipe; wait() turns it into a 'resize' key so the main loop handles it in order
+                self.wake = os.pipe()
+                os.set_blocking(self.wake[1], False)
+                self.saved_winch = signal.signal(signal.SIGWINCH, self.on_resize)
+        return self
+
+    def __exit__(self, *exc):
+        if self.saved is not None:
+            import termios
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+            self.saved = None
+        if self.wake:
+            signal.signal(signal.SIGWINCH, self.saved_winch or signal.SIG_DFL)
+            for fd in self.wake:
+                os.close(fd)
+            self.wake = None
+
+    def on_resize(self, signum, frame):
+        wake = self.wake
+        if wake:
+            try:
+                os.write(wake[1], b'r')
+            except OSError:
+                pass
+
+    def wait(self, timeout):
+        if platform.system() == 'Windows':
+            import msvcrt
+            deadline = time.monotonic() + timeout
+            while not msvcrt.kbhit() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            keys = []
+            while msvcrt.kbhit():
+                ch = msvcrt.getwch()
+                if ch in ('\x00', '\xe0'):
+                    keys.append({'H': 'up', 'P': 'down', 'M': 'right', 'K': 'left'}.get(msvcrt.getwch(), ''))
+                else:
+                    keys.append(ch)
+            return keys
+        if self.fd is None:
+            time.sleep(timeout)
+            return []
+        fds = [self.fd, self.wake[0]] if self.wake else [self.fd]
+        ready = select.select(fds, [], [], timeout)[0]
+        keys = []
+        if self.wake and self.wake[0] in ready:
+            os.read(self.wake[0], 64)
+            keys.append('resize')
+        if self.fd not in ready:
+            return keys
+        data = os.read(self.fd, 64).decode('utf-8', 'ignore')
+        i = 0
+        while i < len(data):
+            if data[i:i + 3] in self.SEQUENCES:
+                keys.append(self.SEQUENCES[data[i:i + 3]])
+                i += 3
+            else:
+                keys.append(data[i])
+                i += 1
+        return keys
+
+class FleetProtocol:
+    FRAME = struct.Struct('!4sBI')
+    MAGIC = b'GXF1'
+    HELLO = 1
+    SNAPSHOT = 2
+    BLOCK = struct.Struct('<dI')
+    MAX_FRAME = 1 << 20
+
+    @classmethod
+    def frame(cls, kind, payload):
+        return cls.FRAME.pack(cls.MAGIC, kind, len(payload)) + payload
+
+    @classmethod
+    async def read_frame(cls, reader):
+        magic, kind, length = cls.FRAME.unpack(await reader.readexactly(cls.FRAME.size))
+        if magic != cls.MAGIC or length > cls.MAX_FRAME:
+            raise ValueError("bad frame")
+        return kind, await reader.readexactly(length)
+
+def parse_endpoint(value):
+    if value.startswith('unix:'):
+        return ('unix', value[5:])
+    host, _, port = value.rpartition(':')
+    try:
+        return ('tcp', host or '127.0.0.1', int(port))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT or unix:PATH, got {value!r}")
+
+def format_endpoint(endpoint):
+    return f"unix:{endpoint[1]}" if endpoint[0] == 'unix' else f"{endpoint[1]}:{endpoint[2]}"
+
+class Agent:
+    def __init__(self, sampler, endpoint, refresh=1.0, pacer=None):
+        self.sampler = sampler
+        self.endpoint = endpoint
+        self.refresh = refresh
+        self.pacer = pacer
+        self.encoder = SnapshotEncoder()
+        self.hello = None
+        self.latest = None
+        self.changed = None
+        self.clients = 0
+
+    def publish(self, snapshot):
+        import asyncio
+        if not self.encoder.append(snapshot):
+            return
+        block_time, count, raw = self.encoder.take_block()
+        if self.hello is None:
+            system = encode_system(snapshot['system'], self.encoder.cores)
+            host = platform.node().encode('utf-8')[:255]
+            self.hello = FleetProtocol.frame(FleetProtocol.HELLO, system + bytes([len(host)]) + host)
+        self.latest = FleetProtocol.frame(FleetProtocol.SNAPSHOT, FleetProtocol.BLOCK.pack(block_time, count) + raw)
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def handle_client(self, reader, writer):
+        import asyncio
+        self.clients += 1
+        try:
+            while self.latest is None:
+                await self.changed.wait()
+            writer.write(self.hello)
+            sent = None
+            while True:
+                if self.latest is sent:
+                    await self.changed.wait()
+                    continue
+                sent = self.latest
+                writer.write(sent)
+                await writer.drain()
+        except asyncio.CancelledError:
+            # Shutdown cancels connected clients; the stream protocol would log a cancelled handler as an error
+            pass
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def serve(self):
+        import asyncio
+        self.changed = asyncio.Event()
+        if self.endpoint[0] == 'unix':
+            server = await asyncio.start_unix_server(self.handle_client, self.endpoint[1])
+        else:
+            server = await asyncio.start_server(self.handle_client, self.endpoint[1], self.endpoint[2])
+        last_time = None
+        next_tick = time.monotonic()
+        async with server:
+            while True:
+                snapshot = self.sampler.snapshot
+                if snapshot.get('time') != last_time:
+                    last_time = snapshot.get('time')
+                    self.publish(snapshot)
+                next_tick += self.pacer.update(snapshot) if self.pacer else self.refresh
+                delay = next_tick - time.monotonic()
+                if delay <= 0:
+                    next_tick = time.monotonic()
+                await asyncio.sleep(max(delay, 0))
+
+    def run(self):
+        import asyncio
+        self.sampler.start()
+        print(f"Galaxy Manager agent serving on {format_endpoint(self.endpoint)}", flush=True)
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.sampler.stop()
+            if self.endpoint[0] == 'unix' and os.path.exists(self.endpoint[1]):
+                os.unlink(self.endpoint[1])
+
+class FleetHost:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.address = format_endpoint(endpoint)
+        self.name = '-'
+        self.system = None
+        self.cores = 1
+        self.snapshot = MappingProxyType({})
+        self.connected = False
+        self.error = None
+        self.received = None
+        self.frames = 0
+        self.reconnects = 0
+
+class Aggregator:
+    CONNECT_TIMEOUT = 5.0
+    MAX_BACKOFF = 30.0
+
+    def __init__(self, endpoints):
+        self.hosts = [FleetHost(endpoint) for endpoint in endpoints]
+        self.loop = None
+        self.thread = None
+
+    async def follow(self, host):
+        import asyncio
+        backoff = 0.5
+        while True:
+            writer = None
+            try:
+                if host.endpoint[0] == 'unix':
+                    connect = asyncio.open_unix_connection(host.endpoint[1])
+                else:
+                    connect = asyncio.open_connection(host.endpoint[1], host.endpoint[2])
+                reader, writer = await asyncio.wait_for(connect, self.CONNECT_TIMEOUT)
+                kind, payload = await FleetProtocol.read_frame(reader)
+                if kind != FleetProtocol.HELLO:
+                    raise ValueError("expected hello")
+                system, cores, offset = decode_system(payload)
+                name = bytes(payload[offset + 1:offset + 1 + payload[offset]]).decode('utf-8', 'replace')
+                host.system, host.cores, host.name = system, cores, name or host.name
+                host.connected, host.error = True, None
+                backoff = 0.5
+                while True:
+                    kind, payload = await FleetProtocol.read_frame(reader)
+                    if kind != FleetProtocol.SNAPSHOT:
+                        continue
+                    block_time, count = FleetProtocol.BLOCK.unpack_from(payload)
+                    snapshots = decode_block(memoryview(payload)[FleetProtocol.BLOCK.size:], count, block_time, cores, system)
+                    host.snapshot = snapshots[-1][1]
+                    host.received = time.monotonic()
+                    host.frames += 1
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print(f"\n{Colors.SHOW_CURSOR}{Colors.RED}Error: {e}{Colors.RESET}")
-                time.sleep(2)
+                host.error = str(e) or type(e).__name__
+            finally:
+                if writer:
+                    writer.close()
+            host.connected = False
+            host.reconnects += 1
+            await asyncio.sleep(backoff * (0.5 + random.random()))
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+    async def follow_all(self):
+        import asyncio
+        await asyncio.gather(*(self.follow(host) for host in self.hosts))
+
+    def run_loop(self):
+        import asyncio
+        try:
+            self.loop.run_until_complete(self.follow_all())
+        except asyncio.CancelledError:
+            pass
+
+    def start(self):
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_loop, name='galaxy-aggregator', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        import asyncio
+        if self.loop:
+            self.loop.call_soon_threadsafe(lambda: [task.cancel() for task in asyncio.all_tasks(self.loop)])
+            self.thread.join(timeout=1)
+
+class FleetHostSource:
+    def __init__(self, host):
+        self.host = host
+        self.cores = host.cores
+
+    @property
+    def snapshot(self):
+        return self.host.snapshot
+
+    @property
+    def status(self):
+        return f"{self.host.name[:14]} {'live' if self.host.connected else 'offline'}"
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class FleetView:
+    SORT_KEYS = {
+        'h': ('HOST', lambda host: host.name),
+        'c': ('CPU', lambda host: -(host.snapshot['cpu'].total if host.snapshot.get('cpu') else -1)),
+        'm': ('MEM', lambda host: -(host.snapshot['memory'].virtual.percent if host.snapshot.get('memory') else -1)),
+        'n': ('NET', lambda host: -sum(host.snapshot['net'].rates or (0, 0)) if host.snapshot.get('net') else 1),
+    }
+
+    def __init__(self, aggregator, refresh=1.0):
+        self.aggregator = aggregator
+        self.refresh = refresh
+        self.sort = 'h'
+        self.selected = 0
+        self.running = True
+        self.terminal_width = shutil.get_terminal_size().columns
+        self.terminal_height = shutil.get_terminal_size().lines
+        self.screen = ScreenBuffer(self.terminal_width, self.terminal_height)
+
+    def ordered(self):
+        return sorted(self.aggregator.hosts, key=self.SORT_KEYS[self.sort][1])
+
+    def draw(self):
+        screen = self.screen
+        width = min(self.terminal_width - 2, 118)
+        col = max((self.terminal_width - width) // 2, 1)
+        screen.put(2, col, f"{Colors.CYAN}{Colors.BOLD}╔═══ FLEET ({len(self.aggregator.hosts)} hosts, sorted by {self.SORT_KEYS[self.sort][0]}) ".ljust(width + 9, '═') + f"╗{Colors.RESET}")
+        header = f"{'HOST':<16} {'ENDPOINT':<22} {'STATUS':<8} {'CPU%':>6} {'MEM%':>6} {'↑ KB/s':>10} {'↓ KB/s':>10} {'READ MB/s':>10} {'WRITE MB/s':>10} {'AGE':>6}"
+        screen.put(3, col, f"{Colors.CYAN}║{Colors.RESET} {Colors.BOLD}{header[:width - 2]:<{width - 2}}{Colors.RESET}{Colors.CYAN}║{Colors.RESET}")
+        hosts = self.ordered()
+        self.selected = min(self.selected, max(len(hosts) - 1, 0))
+        rows = self.terminal_height - 6
+        now = time.monotonic()
+        for i in range(rows):
+            row = 4 + i
+            if i >= len(hosts):
+                screen.put(row, col, f"{Colors.CYAN}║{' ' * (width - 1)}║{Colors.RESET}")
+                continue
+            host = hosts[i]
+            snap = host.snapshot
+            cpu = snap['cpu'].total if snap.get('cpu') else 0
+            mem = snap['memory'].virtual.percent if snap.get('memory') else 0
+            up, down = (snap['net'].rates if snap.get('net') else None) or (0, 0)
+            read, write = (snap['disk'].rates if snap.get('disk') else None) or (0, 0)
+            age = f"{now - host.received:.0f}s" if host.received else '-'
+            status = 'live' if host.connected else 'offline'
+            color = Colors.RED if not host.connected or cpu > 80 else (Colors.YELLOW if cpu > 60 else Colors.GREEN)
+            line = f"{host.name[:16]:<16} {host.address[:22]:<22} {status:<8} {cpu:>6.1f} {mem:>6.1f} {up:>10.1f} {down:>10.1f} {read:>10.2f} {write:>10.2f} {age:>6}"
+            marker = Colors.BOLD + '▶' if i == self.selected else ' '
+            screen.put(row, col, f"{Colors.CYAN}║{Colors.RESET}{marker}{color}{line[:width - 2]:<{width - 2}}{Colors.RESET}{Colors.CYAN}║{Colors.RESET}")
+        screen.put(4 + rows, col, f"{Colors.CYAN}╚" + '═' * (width - 1) + f"╝{Colors.RESET}")
+        footer = f"{Colors.YELLOW}[↑/↓]{Colors.RESET} Select  {Colors.YELLOW}[Enter]{Colors.RESET} Drill down  {Colors.YELLOW}[h/c/m/n]{Colors.RESET} Sort  {Colors.YELLOW}[q]{Colors.RESET} Quit"
+        screen.put(self.terminal_height, col, footer)
+        screen.flush()
+
+    def handle_key(self, key):
+        if key == 'q':
+            self.running = False
+        elif key == 'resize':
+            self.resize()
+        elif key in self.SORT_KEYS:
+            self.sort = key
+        elif key == 'up':
+            self.selected = max(self.selected - 1, 0)
+        elif key == 'down':
+            self.selected += 1
+        elif key in ('\n', '\r'):
+            hosts = self.ordered()
+            if hosts:
+                self.drill_down(hosts[self.selected])
+
+    def resize(self):
+        width, height = shutil.get_terminal_size()
+        if (width, height) != (self.terminal_width, self.terminal_height):
+            self.terminal_width = width
+            self.terminal_height = height
+            self.screen.resize(width, height)
+
+    def drill_down(self, host):
+        app = GalaxyManager(FleetHostSource(host), refresh=self.refresh)
+        app.run()
+        print(Colors.HIDE_CURSOR, end='')
+        os.system('cls' if platform.system() == 'Windows' else 'clear')
+        # The terminal may have been resized while the drill-down view owned it
+        self.resize()
+        self.screen.invalidate()
+
+    def run(self):
+        self.aggregator.start()
+        os.system('cls' if platform.system() == 'Windows' else 'clear')
+        print(Colors.HIDE_CURSOR, end='')
+        next_frame = time.monotonic()
+        try:
+            with KeyReader() as keys:
+                while self.running:
+                    self.draw()
+                    next_frame += self.refresh
+                    delay = next_frame - time.monotonic()
+                    if delay <= 0:
+                        next_frame = time.monotonic()
+                    while delay > 0:
+                        pressed = keys.wait(delay)
+                        if pressed:
+                            for key in pressed:
+                                self.handle_key(key)
+                            self.draw()
+                        delay = next_frame - time.monotonic()
+        except KeyboardInterrupt:
+            print(f"\n\n{Colors.SHOW_CURSOR}{Colors.CYAN}Galaxy Manager terminated.{Colors.RESET}\n")
+        finally:
+            self.aggregator.stop()
+            print(Colors.SHOW_CURSOR, end='', flush=True)
 
 def setup_console():
     if platform.system() == 'Windows':
@@ -438,16 +3645,185 @@ def setup_console():
         kernel32 = ctypes.windll.kernel32
         kernel32.SetConsoleTitleW("Galaxy Manager - System Monitor")
 
-def main():
+def parse_interval(value):
+    name, _, seconds = value.partition('=')
+    if not name or not seconds:
+        raise argparse.ArgumentTypeError(f"expected METRIC=SECONDS with METRIC in {', '.join(Sampler.DEFAULT_INTERVALS)} or a plugin")
+    return name, float(seconds)
+
+def parse_refresh(value):
+    if value == 'auto':
+        return value
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected SECONDS or 'auto', got {value!r}")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("refresh interval must be positive")
+    return seconds
+
+def parse_address(value):
+    host, _, port = value.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected [HOST:]PORT, got {value!r}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Galaxy Manager - System Monitor")
+    parser.add_argument('--refresh', type=parse_refresh, default=1.0, metavar='SECONDS|auto',
+                        help="refresh interval in seconds, or 'auto' to speed up to 4Hz on spikes and back off to 10s when steady or unfocused")
+    parser.add_argument('--interval', type=parse_interval, action='append', default=[], metavar='METRIC=SECONDS',
+                        help="sampling interval for one metric, may be repeated")
+    parser.add_argument('--sort', choices=list(ProcessTable.SORT_KEYS), default='cpu',
+                        help="top processes ordering; io (disk read+write per second) and connections switch the panel to I/O columns (s cycles)")
+    parser.add_argument('--group', choices=Sampler.PROCESS_VIEWS, default='flat',
+                        help="TOP PROCESSES panel: flat list, process tree, or rollups by user or cgroup (g cycles, Enter expands)")
+    parser.add_argument('--history', type=float, default=60, metavar='MINUTES', help="length of the in-memory metric history")
+    parser.add_argument('--cores', choices=GalaxyManager.CORE_VIEWS, default='auto',
+                        help="CPU CORES panel: per-core bars, heatmap grid, or NUMA node / package averages")
+    parser.add_argument('--backend', choices=Sampler.BACKENDS, default='auto',
+                        help="collector backend: persistent /proc readers on Linux, or psutil everywhere")
+    parser.add_argument('--profile-dump', metavar='FILE', help="write collector and panel timings plus self CPU/RSS as JSON on exit")
+    parser.add_argument('--budget', type=float, metavar='PERCENT',
+                        help="fail with exit status 1 if average self CPU use exceeds this share of one core")
+    parser.add_argument('--alerts', metavar='FILE', help="alert rules, one per line, e.g. 'hot: temperature > 85 for 30s'")
+    parser.add_argument('--alert-log', metavar='FILE', help="append fired and resolved alerts as JSON Lines")
+    parser.add_argument('--alert-webhook', metavar='URL', help="POST each fired and resolved alert as JSON")
+    parser.add_argument('--plugin', action='append', default=[], metavar='NAME',
+                        help=f"enable a collector/panel plugin, may be repeated (built in: {', '.join(BUILTIN_PLUGINS)})")
+    parser.add_argument('--list-plugins', action='store_true', help="list built-in and installed plugins without loading them")
+    parser.add_argument('--headless', action='store_true', help="export snapshots without drawing the dashboard")
+    parser.add_argument('--output', metavar='FILE', help="headless JSON Lines destination, '-' for stdout (default: stdout unless --prometheus is given)")
+    parser.add_argument('--prometheus', type=parse_address, metavar='[HOST:]PORT', help="headless Prometheus text endpoint")
+    parser.add_argument('--record', metavar='FILE', help="append every sampled snapshot to a binary recording")
+    parser.add_argument('--compress', choices=sorted(CODECS), default='zlib', help="block compression for --record")
+    parser.add_argument('--replay', metavar='FILE', help="drive the dashboard from a recording instead of live sampling")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed multiplier ([ and ] change it while running)")
+    parser.add_argument('--seek', type=float, default=0.0, metavar='SECONDS',
+                        help="start the replay this many seconds in (arrow keys seek while running)")
+    parser.add_argument('--agent', type=parse_endpoint, metavar='HOST:PORT|unix:PATH',
+                        help="publish snapshots to fleet aggregators instead of drawing the dashboard")
+    parser.add_argument('--fleet', action='append', default=[], metavar='ENDPOINT[,ENDPOINT...]',
+                        help="show a fleet dashboard over the given agents, may be repeated")
+    args = parser.parse_args(argv)
+    if args.list_plugins:
+        print(list_plugins())
+        parser.exit()
+    unknown = [name for name, _ in args.interval if name not in Sampler.DEFAULT_INTERVALS and name not in args.plugin]
+    if unknown:
+        parser.error(f"--interval {unknown[0]}: not a metric or an enabled plugin")
+    try:
+        args.fleet = [parse_endpoint(value) for item in args.fleet for value in item.split(',') if value]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if args.agent and (args.headless or args.fleet):
+        parser.error("--agent cannot be combined with --headless or --fleet")
+    if (args.output or args.prometheus) and not args.headless:
+        parser.error("--output and --prometheus require --headless")
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
+    if args.record and (args.agent or args.fleet):
+        parser.error("--record cannot be combined with --agent or --fleet")
+    if args.compress == 'zstd' and zstandard is None:
+        parser.error("--compress zstd needs the 'zstandard' package")
+    if (args.alert_log or args.alert_webhook) and not args.alerts:
+        parser.error("--alert-log and --alert-webhook require --alerts")
+    if args.alerts:
+        try:
+            args.alerts = load_rules(args.alerts)
+        except (OSError, ValueError) as e:
+            parser.error(f"--alerts {args.alerts}: {e}")
+    args.adaptive = args.refresh == 'auto'
+    if args.adaptive:
+        args.refresh = 1.0
+    if args.backend == 'proc' and not ProcReader.available():
+        parser.error("--backend proc needs a readable Linux /proc")
+    if args.plugin and (args.replay or args.fleet):
+        parser.error("--plugin needs live sampling, not --replay or --fleet")
+    try:
+        args.plugins = load_plugins(args.plugin)
+    except ValueError as e:
+        parser.error(f"--plugin: {e}")
+    if args.headless and not args.output and not args.prometheus and not args.record:
+        args.output = '-'
+    return args
+
+def launch(args, profiler, alerts):
+    if args.fleet:
+        setup_console()
+        FleetView(Aggregator(args.fleet), refresh=args.refresh).run()
+        return
+    
+    if args.replay:
+        try:
+            sampler = ReplaySource(args.replay, speed=args.speed, seek=args.seek)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.RED}Cannot replay {args.replay}: {e}{Colors.RESET}")
+            return
+    else:
+        sampler = Sampler(dict(args.interval), process_sort=args.sort, backend=args.backend, profiler=profiler,
+                          process_view=args.group, plugins=args.plugins,
+                          process_series=alerts is not None and 'process_series' in alerts.sources)
+    recorder = None
+    if args.record:
+        recorder = Recorder(args.record, args.compress)
+        try:
+            recorder.open_file(sampler.reader.system if args.replay else sampler.collect_system(), sampler.cores)
+        except (OSError, ValueError) as e:
+            sampler.stop()
+            print(f"{Colors.RED}Cannot record to {args.record}: {e}{Colors.RESET}")
+            return
+    pacer = AdaptiveRefresh(sampler, alerts) if args.adaptive else None
+    if args.agent:
+        Agent(sampler, args.agent, refresh=args.refresh, pacer=pacer).run()
+        return
+    
+    if args.headless:
+        HeadlessExporter(sampler, refresh=args.refresh, output=args.output, prometheus=args.prometheus, recorder=recorder,
+                         alerts=alerts, pacer=pacer).run()
+        return
+    
     setup_console()
     
     try:
-        app = GalaxyManager()
+        app = GalaxyManager(sampler, refresh=args.refresh, history_minutes=args.history, core_view=args.cores, recorder=recorder,
+                           profiler=profiler, alerts=alerts, pacer=pacer, plugins=args.plugins)
         app.run()
     except KeyboardInterrupt:
         print(f"\n{Colors.SHOW_CURSOR}{Colors.CYAN}Goodbye!{Colors.RESET}\n")
     except Exception as e:
         print(f"\n{Colors.SHOW_CURSOR}{Colors.RED}Critical Error: {e}{Colors.RESET}")
 
+def terminate(signum, frame):
+    # 'timeout' and service managers may signal the whole group again; one shutdown is enough
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+def main():
+    args = parse_args()
+    # SIGTERM takes the same shutdown path as Ctrl+C, so recordings and exports are flushed and closed
+    signal.signal(signal.SIGTERM, terminate)
+    profiler = Profiler(budget=args.budget)
+    alerts = None
+    if args.alerts:
+        sinks = []
+        if args.alert_log:
+            sinks.append(AlertLog(args.alert_log))
+        if args.alert_webhook:
+            sinks.append(AlertWebhook(args.alert_webhook))
+        alerts = AlertEngine(args.alerts, sinks)
+    launch(args, profiler, alerts)
+    for plugin in args.plugins:
+        plugin.close()
+    if alerts:
+        alerts.close()
+    if args.profile_dump:
+        profiler.dump(args.profile_dump)
+    usage = profiler.usage()
+    if profiler.over_budget(usage):
+        print(f"{Colors.RED}Over budget: {usage['avg_cpu_percent']:.2f}% of one core, budget {args.budget:g}%{Colors.RESET}", file=sys.stderr)
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file